@@ -0,0 +1,125 @@
+import argparse
+import asyncio
+import time
+
+from fastapi import Response
+from starlette.requests import Request
+
+from scripts.constants.common_constants import Secrets
+
+USER_ID = "user_099"
+
+
+def install_fakes():
+    """
+    Points the auth and RBAC modules at fakeredis (see requirements-dev.txt), so only the
+    dependency code is measured
+    """
+    import fakeredis.aioredis
+
+    import scripts.utils.security_utils.apply_encrytion_util as apply_encrytion_util
+    import scripts.utils.security_utils.decorators as decorators
+    import scripts.utils.security_utils.rbac as rbac
+
+    login_db = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    apply_encrytion_util.async_login_db = login_db
+    decorators.async_login_db = login_db
+    rbac.async_user_permissions_redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    return rbac.async_user_permissions_redis
+
+
+def make_request(login_token):
+    cookies = f"login-token={login_token}; user_id={USER_ID}; userId={USER_ID}; language=en"
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/api/posts",
+            "headers": [(b"cookie", cookies.encode())],
+            "client": ("127.0.0.1", 50000),
+            "state": {},
+        }
+    )
+
+
+async def legacy_rbac(rbac, request):
+    """
+    RBAC.__call__ before the shared context: own cookie parsing and permission lookup
+    """
+    user_id = request.cookies.get("userId", request.headers.get("userId"))
+    return rbac.evaluate(await rbac.fetch_user_permissions(user_id))
+
+
+async def legacy_meta(request):
+    """
+    MetaInfoCookie.__call__ before the shared context: own parsing and a validated model
+    """
+    from scripts.utils.security_utils.project_decorator import MetaInfoSchema
+
+    cookies = request.cookies
+    cookie_json = {
+        "userId": cookies.get("user_id", cookies.get("userId", request.headers.get("userId"))),
+        "language": cookies.get("language", request.headers.get("language")),
+    }
+    return MetaInfoSchema(user_id=cookie_json["userId"], language=cookie_json["language"])
+
+
+async def before(authentication, rbacs, meta_cookie, login_token):
+    request = make_request(login_token)
+    await authentication(request, Response())
+    for rbac in rbacs:
+        await legacy_rbac(rbac, request)
+    await legacy_meta(request)
+
+
+async def after(authentication, rbacs, meta_cookie, login_token):
+    request = make_request(login_token)
+    await authentication(request, Response())
+    for rbac in rbacs:
+        await rbac(request)
+    await meta_cookie(request, Response())
+
+
+async def microseconds_per_request(chain, requests, *args):
+    start = time.perf_counter()
+    for _ in range(requests):
+        await chain(*args)
+    return (time.perf_counter() - start) * 1_000_000 / requests
+
+
+async def run(requests, rbac_dependencies):
+    permissions_redis = install_fakes()
+    from scripts.utils.security_utils.apply_encrytion_util import create_token
+    from scripts.utils.security_utils.decorators import CookieAuthentication
+    from scripts.utils.security_utils.permission_mask import compile_operations
+    from scripts.utils.security_utils.project_decorator import MetaInfoCookie
+    from scripts.utils.security_utils.rbac import RBAC
+
+    await permissions_redis.hset(USER_ID, "blog_post", compile_operations(["view", "create", "edit"]))
+    login_token = await create_token(user_id=USER_ID, ip="127.0.0.1", token=Secrets.token)
+    args = (
+        CookieAuthentication(),
+        [RBAC(entity_name="blog_post", operation=["view"]) for _ in range(rbac_dependencies)],
+        MetaInfoCookie(),
+        login_token,
+    )
+    # warm up the verified token cache and the JWT keys
+    await before(*args)
+    await after(*args)
+    before_cost = await microseconds_per_request(before, requests, *args)
+    after_cost = await microseconds_per_request(after, requests, *args)
+    print(f"{rbac_dependencies} RBAC dependencies, permission cache off, fakeredis")
+    print(f"{'chain':<10}{'us/request':>12}")
+    print(f"{'before':<10}{before_cost:>12.1f}")
+    print(f"{'after':<10}{after_cost:>12.1f}")
+    print(f"saved {before_cost - after_cost:.1f} us/request ({1 - after_cost / before_cost:.0%})")
+
+
+# per request overhead of the CookieAuthentication, RBAC and MetaInfoCookie dependencies,
+# each parsing on its own (before) vs one shared AuthContext (after)
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", "-n", type=int, default=5000, help="Requests per measurement.")
+    ap.add_argument("--rbac-dependencies", type=int, default=2, help="RBAC dependencies resolved per request.")
+    arguments = ap.parse_args()
+    asyncio.run(run(arguments.requests, arguments.rbac_dependencies))
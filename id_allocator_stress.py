@@ -0,0 +1,89 @@
+import argparse
+import asyncio
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from scripts.db.mongo.blog_posts.collections.unique_id import UniqueId
+from scripts.utils.id_allocator import IdBlockAllocator
+
+
+async def draw(database, key, block_size, count, concurrency):
+    """
+    Draws `count` ids from a fresh allocator, the way one worker process does, with
+    `concurrency` tasks asking for ids at the same time
+    """
+    from scripts.db.mongo import async_mongo_client
+
+    unique_con = UniqueId(async_mongo_client)
+    unique_con.database = database
+    allocator = IdBlockAllocator(unique_con, key=key, block_size=block_size)
+    ids = []
+
+    async def worker(share):
+        for _ in range(share):
+            ids.append(await allocator.next_id())
+
+    shares = [count // concurrency + (index < count % concurrency) for index in range(concurrency)]
+    await asyncio.gather(*(worker(share) for share in shares))
+    return ids
+
+
+def process_main(database, key, block_size, count, concurrency, start_at):
+    # start every process at the same moment so their reservations overlap
+    time.sleep(max(0.0, start_at - time.time()))
+    return asyncio.run(draw(database, key, block_size, count, concurrency))
+
+
+async def drop(database):
+    from scripts.db.mongo import async_mongo_client
+
+    await async_mongo_client.drop_database(database)
+
+
+def run(arguments):
+    start_at = time.time() + arguments.startup_delay
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=arguments.processes) as executor:
+        futures = [
+            executor.submit(
+                process_main,
+                arguments.database,
+                arguments.key,
+                arguments.block_size,
+                arguments.ids,
+                arguments.concurrency,
+                start_at,
+            )
+            for _ in range(arguments.processes)
+        ]
+        per_process = [future.result() for future in futures]
+    elapsed = time.perf_counter() - started - arguments.startup_delay
+    counts = Counter(each for ids in per_process for each in ids)
+    duplicates = {each: seen for each, seen in counts.items() if seen > 1}
+    total = sum(counts.values())
+    print(
+        f"{arguments.processes} processes x {arguments.ids:,} ids, block size {arguments.block_size}: "
+        f"{total:,} ids, {len(counts):,} unique, {total / max(elapsed, 1e-9):,.0f} ids/s"
+    )
+    if arguments.drop:
+        asyncio.run(drop(arguments.database))
+    if duplicates:
+        print(f"DUPLICATES {len(duplicates):,}, e.g. {sorted(duplicates.items())[:10]}")
+        return 1
+    return 0
+
+
+# multi-process uniqueness check of UniqueId.reserve_block and IdBlockAllocator, run against a scratch database
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--database", default="blog_posts_id_stress", help="Scratch database holding the counter.")
+    ap.add_argument("--key", default="post_id", help="unique_id key to draw from.")
+    ap.add_argument("--processes", "-p", type=int, default=8, help="Worker processes, each with its own allocator.")
+    ap.add_argument("--ids", "-n", type=int, default=5000, help="Ids drawn per process.")
+    ap.add_argument("--concurrency", "-c", type=int, default=20, help="Tasks drawing ids at once per process.")
+    ap.add_argument("--block-size", type=int, default=20, help="Ids reserved per round trip, 1 reserves every id.")
+    ap.add_argument("--startup-delay", type=float, default=3.0, help="Seconds given to the processes to start.")
+    ap.add_argument("--drop", action="store_true", help="Drop the scratch database afterwards.")
+    sys.exit(run(ap.parse_args()))
@@ -0,0 +1,60 @@
+import argparse
+import secrets
+import time
+from datetime import datetime, timedelta
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+from scripts.constants.common_constants import Secrets
+
+
+def generate_keys():
+    """
+    Returns throwaway (private, public) key pairs for every algorithm the JWT KeyStore supports
+    """
+    rsa_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    ed_key = ed25519.Ed25519PrivateKey.generate()
+    ec_key = ec.generate_private_key(ec.SECP256R1())
+    hmac_secret = secrets.token_bytes(32)
+    return {
+        "RS256": (rsa_key, rsa_key.public_key()),
+        "EdDSA": (ed_key, ed_key.public_key()),
+        "ES256": (ec_key, ec_key.public_key()),
+        "HS256": (hmac_secret, hmac_secret),
+    }
+
+
+def ops_per_second(func, duration):
+    count = 0
+    start = time.perf_counter()
+    deadline = start + duration
+    while time.perf_counter() < deadline:
+        func()
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def run(duration):
+    payload = {
+        "ip": "127.0.0.1",
+        "user_id": "user_099",
+        "token": Secrets.token,
+        "uid": secrets.token_hex(16),
+        "age": Secrets.LOCK_OUT_TIME_MINS,
+        "iss": Secrets.issuer,
+        "exp": datetime.utcnow() + timedelta(minutes=Secrets.LOCK_OUT_TIME_MINS),
+    }
+    print(f"{'algorithm':<10}{'sign ops/s':>14}{'verify ops/s':>14}")
+    for algorithm, (private_key, public_key) in generate_keys().items():
+        token = jwt.encode(payload, private_key, algorithm=algorithm)
+        sign = ops_per_second(lambda: jwt.encode(payload, private_key, algorithm=algorithm), duration)
+        verify = ops_per_second(lambda: jwt.decode(token, public_key, algorithms=[algorithm]), duration)
+        print(f"{algorithm:<10}{sign:>14,.0f}{verify:>14,.0f}")
+
+
+# sign/verify micro-benchmark for the supported session token algorithms
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--duration", "-d", type=float, default=2.0, help="Seconds to run each measurement.")
+    run(ap.parse_args().duration)
@@ -0,0 +1,277 @@
+import argparse
+import asyncio
+import itertools
+import random
+import sys
+import time
+from collections import defaultdict
+
+import httpx
+import orjson
+
+from scripts.constants.app_constants import APIEndpoints
+from scripts.constants.common_constants import Secrets
+
+OPERATIONS = ("create", "update", "get", "batch", "list", "delete")
+DEFAULT_WEIGHTS = "create=2,update=2,get=10,batch=2,list=3,delete=1"
+
+
+def install_fakes():
+    """
+    Swaps the Mongo and Redis clients of the app for in-process fakes (mongomock_motor
+    and fakeredis, see requirements-dev.txt), so the harness runs without mongod or redis.
+    Only the HTTP, handler and serialization paths are measured then, not real datastore
+    latency. mongomock rejects the sort of pymongo's UpdateOne, so /posts/bulk fails under
+    the fakes and is not part of the synthetic mix; search ($text) is unsupported as well.
+    """
+    import fakeredis.aioredis
+    from mongomock_motor import AsyncMongoMockClient
+
+    import scripts.core.handlers.blog_post_handler as blog_post_handler
+    import scripts.db.mongo as mongo
+    import scripts.db.redis_connection as redis_connection
+    import scripts.utils.id_allocator as id_allocator
+    import scripts.utils.security_utils.apply_encrytion_util as apply_encrytion_util
+    import scripts.utils.security_utils.decorators as decorators
+    import scripts.utils.security_utils.rbac as rbac
+    from scripts.db.mongo.blog_posts.collections.unique_id import UniqueId
+
+    mongo_client = AsyncMongoMockClient()
+    login_db = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    permissions_db = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    for module in (mongo, blog_post_handler, id_allocator):
+        module.async_mongo_client = mongo_client
+    for module in (redis_connection, apply_encrytion_util, decorators):
+        module.async_login_db = login_db
+    for module in (redis_connection, rbac):
+        module.async_user_permissions_redis = permissions_db
+
+    counters = defaultdict(lambda: 100)
+
+    # mongomock has no $convert, reserve id blocks from an in-memory counter instead
+    async def reserve_block(self, key, size):
+        counters[key] += size
+        return counters[key] - 1
+
+    UniqueId.reserve_block = reserve_block
+
+
+async def prepare_session(user_id, seed_permissions):
+    """
+    Mints a login token the way the login service does and optionally grants the user
+    every blog_post operation. Returns the cookies to send with each request.
+    """
+    from scripts.db import redis_connection
+    from scripts.utils.security_utils.apply_encrytion_util import create_token
+    from scripts.utils.security_utils.permission_mask import compile_operations
+
+    if seed_permissions:
+        await redis_connection.async_user_permissions_redis.hset(
+            user_id, "blog_post", compile_operations(["view", "create", "edit", "delete"])
+        )
+    login_token = await create_token(user_id=user_id, ip="127.0.0.1", token=Secrets.token)
+    return {"login-token": login_token, "user_id": user_id}
+
+
+def read_mix(path):
+    """
+    Reads a recorded request mix, one JSON object per line, either a synthetic operation
+    {"op": "get"} or a concrete request {"method": "GET", "path": "/api/posts", "params": {...}, "json": {...}}
+    """
+    entries = []
+    with open(path, "rb") as mix:
+        for number, line in enumerate(mix, start=1):
+            if not line.strip():
+                continue
+            entry = orjson.loads(line)
+            if entry.get("op") not in OPERATIONS and not {"method", "path"} <= entry.keys():
+                raise SystemExit(f"{path}:{number} is neither an operation of {OPERATIONS} nor a recorded request")
+            entries.append(entry)
+    return entries
+
+
+def synthetic_mix(weights, total, seed):
+    pairs = [pair.split("=") for pair in weights.split(",") if pair]
+    unknown = {name for name, _ in pairs} - set(OPERATIONS)
+    if unknown:
+        raise SystemExit(f"Unknown operations {sorted(unknown)}, use {OPERATIONS}")
+    rng = random.Random(seed)
+    names = [name for name, _ in pairs]
+    return [{"op": op} for op in rng.choices(names, [float(weight) for _, weight in pairs], k=total)]
+
+
+class LoadTest:
+    def __init__(self, client: httpx.AsyncClient, seed: int):
+        self.client = client
+        self.rng = random.Random(seed)
+        self.post_ids = []
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.sequence = itertools.count()
+
+    def synthetic_request(self, op):
+        """
+        Returns (endpoint label, method, path, params, json body) for a synthetic operation
+        """
+        api = APIEndpoints.proxy_api
+        number = next(self.sequence)
+        post = {"title": f"Load test post {number}", "content": "lorem ipsum dolor sit amet " * 40}
+        if op == "create" or (op != "list" and not self.post_ids):
+            return "POST " + APIEndpoints.api_posts, "POST", api + APIEndpoints.api_posts, None, post
+        if op == "update":
+            params = {"post_id": self.rng.choice(self.post_ids)}
+            return "PUT " + APIEndpoints.api_posts, "PUT", api + APIEndpoints.api_posts, params, post
+        if op == "get":
+            params = {"post_id": self.rng.choice(self.post_ids)}
+            return "GET " + APIEndpoints.api_posts, "GET", api + APIEndpoints.api_posts, params, None
+        if op == "batch":
+            params = {"post_ids": self.rng.sample(self.post_ids, min(20, len(self.post_ids)))}
+            return "GET " + APIEndpoints.api_posts_batch, "GET", api + APIEndpoints.api_posts_batch, params, None
+        if op == "list":
+            params = {"page_size": 50, "fields": "title,meta"}
+            return "GET " + APIEndpoints.api_fetch_all_posts, "GET", api + APIEndpoints.api_fetch_all_posts, params, None
+        params = {"post_id": self.post_ids.pop(self.rng.randrange(len(self.post_ids)))}
+        return "DELETE " + APIEndpoints.api_posts, "DELETE", api + APIEndpoints.api_posts, params, None
+
+    async def send(self, entry):
+        if "op" in entry:
+            label, method, path, params, body = self.synthetic_request(entry["op"])
+        else:
+            method, path = entry["method"].upper(), entry["path"]
+            label, params, body = f"{method} {path}", entry.get("params"), entry.get("json")
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, params=params, json=body)
+            elapsed = time.perf_counter() - start
+            payload = response.json() if response.headers.get("content-type", "").startswith("application/json") else {}
+            failed = response.status_code >= 400 or payload.get("status") == "failed"
+        except httpx.HTTPError:
+            elapsed, payload, failed = time.perf_counter() - start, {}, True
+        self.latencies[label].append(elapsed)
+        if failed:
+            self.errors[label] += 1
+        elif method == "POST" and path.endswith(APIEndpoints.api_posts) and isinstance(payload.get("data"), dict):
+            self.post_ids.append(payload["data"]["post_id"])
+
+    async def run(self, entries, concurrency):
+        queue = iter(entries)
+
+        async def worker():
+            for entry in queue:
+                await self.send(entry)
+                # the in-process fakes never suspend, let the other workers and background tasks run
+                await asyncio.sleep(0)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - start
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+
+def summarize(latencies, errors, elapsed):
+    report = {}
+    for label, values in sorted(latencies.items()):
+        report[label] = {
+            "requests": len(values),
+            "errors": errors.get(label, 0),
+            "rps": len(values) / elapsed,
+            "p50_ms": percentile(values, 0.50) * 1000,
+            "p95_ms": percentile(values, 0.95) * 1000,
+            "p99_ms": percentile(values, 0.99) * 1000,
+        }
+    total = sum(len(values) for values in latencies.values())
+    report["TOTAL"] = {
+        "requests": total,
+        "errors": sum(errors.values()),
+        "rps": total / elapsed,
+        **{
+            f"p{int(q * 100)}_ms": percentile([v for values in latencies.values() for v in values], q) * 1000
+            for q in (0.50, 0.95, 0.99)
+        },
+    }
+    return report
+
+
+def print_report(report, elapsed):
+    print(f"{'endpoint':<28}{'requests':>9}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for label, row in report.items():
+        print(
+            f"{label:<28}{row['requests']:>9}{row['errors']:>8}{row['rps']:>9.1f}"
+            f"{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}{row['p99_ms']:>9.2f}"
+        )
+    print(f"elapsed {elapsed:.2f} s")
+
+
+def regressions(report, baseline, tolerance):
+    """
+    Endpoints whose p95 grew by more than `tolerance` (0.2 = 20%) against a previous --output
+    """
+    return [
+        f"{label}: p95 {row['p95_ms']:.2f} ms vs {baseline[label]['p95_ms']:.2f} ms"
+        for label, row in report.items()
+        if label in baseline and row["p95_ms"] > baseline[label]["p95_ms"] * (1 + tolerance)
+    ]
+
+
+async def main(arguments):
+    if arguments.url is None and arguments.fakes:
+        install_fakes()
+    if arguments.url is None:
+        from main import app
+        from scripts.db.mongo.indexes import ensure_indexes
+
+        if not arguments.fakes:
+            await ensure_indexes()
+        transport, base_url = httpx.ASGITransport(app=app), "http://load-test"
+    else:
+        transport, base_url = None, arguments.url
+    cookies = await prepare_session(arguments.user_id, arguments.fakes or arguments.seed_permissions)
+    entries = read_mix(arguments.mix) if arguments.mix else synthetic_mix(arguments.weights, arguments.requests, arguments.seed)
+
+    async with httpx.AsyncClient(
+        transport=transport, base_url=base_url, cookies=cookies, timeout=arguments.timeout
+    ) as client:
+        load_test = LoadTest(client, arguments.seed)
+        if arguments.seed_posts:
+            await load_test.run([{"op": "create"}] * arguments.seed_posts, arguments.concurrency)
+            load_test.latencies.clear()
+            load_test.errors.clear()
+        elapsed = await load_test.run(entries, arguments.concurrency)
+
+    report = summarize(load_test.latencies, load_test.errors, elapsed)
+    print_report(report, elapsed)
+    if arguments.output:
+        with open(arguments.output, "wb") as output:
+            output.write(orjson.dumps(report, option=orjson.OPT_INDENT_2))
+    if arguments.baseline:
+        with open(arguments.baseline, "rb") as baseline:
+            regressed = regressions(report, orjson.loads(baseline.read()), arguments.max_regression)
+        for line in regressed:
+            print(f"REGRESSION {line}")
+        return 1 if regressed else 0
+    return 0
+
+
+# end-to-end load test against a running service (--url) or the app in-process,
+# needs the packages of requirements-dev.txt
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--url", help="Base URL of a running service, the app runs in-process when omitted.")
+    ap.add_argument("--fakes", action="store_true", help="In-process only: use fakeredis and mongomock_motor.")
+    ap.add_argument("--mix", help="JSONL request mix to replay, see read_mix. Synthetic --weights otherwise.")
+    ap.add_argument("--weights", default=DEFAULT_WEIGHTS, help="Synthetic mix as op=weight pairs.")
+    ap.add_argument("--requests", "-n", type=int, default=2000, help="Requests of the synthetic mix.")
+    ap.add_argument("--concurrency", "-c", type=int, default=20, help="Requests in flight at once.")
+    ap.add_argument("--seed-posts", type=int, default=100, help="Posts created before measuring.")
+    ap.add_argument("--user-id", default="load_test_user", help="User the session token is minted for.")
+    ap.add_argument("--seed-permissions", action="store_true", help="Grant the user all blog_post operations in Redis.")
+    ap.add_argument("--seed", type=int, default=7, help="Random seed of the synthetic mix.")
+    ap.add_argument("--timeout", type=float, default=30, help="Per request timeout in seconds.")
+    ap.add_argument("--output", help="Write the per endpoint report as JSON.")
+    ap.add_argument("--baseline", help="Previous --output to compare p95 latencies against.")
+    ap.add_argument("--max-regression", type=float, default=0.2, help="Allowed p95 growth against the baseline.")
+    sys.exit(asyncio.run(main(ap.parse_args())))
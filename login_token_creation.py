@@ -3,6 +3,7 @@ from datetime import datetime, timedelta
 
 from scripts.constants.common_constants import Secrets
 from scripts.db.redis_connection import login_db
+from scripts.utils.security_utils.apply_encrytion_util import session_lifetime
 from scripts.utils.security_utils.jwt_util import JWT
 
 jwt = JWT()
@@ -18,15 +19,14 @@ def create_token(user_id, ip, token, age=Secrets.LOCK_OUT_TIME_MINS, login_token
             uid = str(uuid.uuid4()).replace("-", "")
 
         payload = {"ip": ip, "user_id": user_id, "token": token, "uid": uid, "age": age}
-        exp = datetime.utcnow() + timedelta(minutes=age)
+        exp = datetime.utcnow() + session_lifetime(age)
         _extras = {"iss": Secrets.issuer, "exp": exp}
         _payload = {**payload, **_extras}
 
         new_token = jwt.encode(_payload)
 
         # Add session to redis
-        login_db.set(uid, new_token)
-        login_db.expire(uid, timedelta(minutes=age))
+        login_db.set(uid, new_token, ex=timedelta(minutes=age))
 
         return uid
     except Exception:
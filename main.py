@@ -1,9 +1,29 @@
+import asyncio
 import os
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from scripts.config import DBConf
 from scripts.constants import AppSpec
+from scripts.db.mongo.indexes import ensure_indexes, verify_query_plans
+from scripts.errors import IndexCreationError
 from scripts.services import router
+from scripts.utils.security_utils.permission_cache import listen_for_permission_changes
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    if DBConf.ENSURE_INDEXES_ON_STARTUP and (failures := await ensure_indexes()):
+        raise IndexCreationError(f"Index creation failed for {failures}")
+    if DBConf.VERIFY_QUERY_PLANS_ON_STARTUP:
+        await verify_query_plans()
+    permission_listener = asyncio.create_task(listen_for_permission_changes())
+    yield
+    permission_listener.cancel()
+    with suppress(asyncio.CancelledError):
+        await permission_listener
+
 
 app = FastAPI(
     title=AppSpec.name,
@@ -11,6 +31,7 @@ app = FastAPI(
     summary=AppSpec.summary,
     version="7.09",
     root_path="/form-mt",
+    lifespan=lifespan,
 )
 
 if os.environ.get("ENABLE_CORS") in (True, "true", "True") and os.environ.get("CORS_URLS"):
@@ -0,0 +1,80 @@
+import argparse
+import sys
+
+import orjson as json
+from redis.exceptions import WatchError
+
+from scripts.db.redis_connection import user_permissions_redis
+from scripts.logging import logger
+from scripts.utils.security_utils.permission_mask import compile_permission_record, unknown_operations
+
+
+def compile_records(records, user_id):
+    """
+    Compiles the legacy JSON records of one user hash. Records with operations that have
+    no bit position are left as they are, converting them would drop those grants.
+    """
+    compiled = {}
+    for entity, value in records.items():
+        if not value.startswith("{"):
+            continue
+        try:
+            record = json.loads(value)
+        except json.JSONDecodeError:
+            logger.warning(f"Skipping malformed {entity} permission record of user {user_id}")
+            continue
+        if unknown := unknown_operations(record):
+            logger.warning(f"Skipping {entity} permission record of user {user_id}, unknown operations {unknown}")
+            continue
+        compiled[entity] = compile_permission_record(record, user_id=user_id)
+    return compiled
+
+
+def migrate_user(user_id, dry_run=False, retries=3):
+    """
+    Rewrites the legacy JSON records of one user permission hash as compiled masks.
+    The hash is watched so a concurrent permission change aborts the write instead of
+    being overwritten, the user is then re-read up to `retries` times.
+    Returns the number of converted records, None if the user could not be converted.
+    """
+    for _ in range(retries + 1):
+        with user_permissions_redis.pipeline() as pipe:
+            try:
+                pipe.watch(user_id)
+                compiled = compile_records(pipe.hgetall(user_id), user_id)
+                if not compiled or dry_run:
+                    pipe.unwatch()
+                    return len(compiled)
+                pipe.multi()
+                pipe.hset(user_id, mapping=compiled)
+                pipe.execute()
+                return len(compiled)
+            except WatchError:
+                logger.info(f"Permissions of user {user_id} changed during the migration, retrying")
+    logger.error(f"Could not convert the permissions of user {user_id}, they kept changing")
+    return None
+
+
+def migrate(dry_run=False, batch_size=500):
+    users = entities = 0
+    failed = []
+    for user_id in user_permissions_redis.scan_iter(count=batch_size, _type="hash"):
+        converted = migrate_user(user_id, dry_run=dry_run)
+        if converted is None:
+            failed.append(user_id)
+        elif converted:
+            users += 1
+            entities += converted
+    logger.info(f"{'Would convert' if dry_run else 'Converted'} {entities} permission records of {users} users")
+    if failed:
+        logger.error(f"Not converted, re-run the migration for: {failed}")
+    return failed
+
+
+# one-off conversion of JSON permission records to bitmasks
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--dry-run", action="store_true", help="Only report what would be converted.")
+    ap.add_argument("--batch-size", type=int, default=500, help="SCAN count hint.")
+    arguments = ap.parse_args()
+    sys.exit(1 if migrate(dry_run=arguments.dry_run, batch_size=arguments.batch_size) else 0)
@@ -0,0 +1,117 @@
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from pymongo import ASCENDING, IndexModel
+
+from scripts.db.mongo import async_mongo_client, mongo_client
+from scripts.utils.mongo_util import AsyncMongoCollectionBaseClass, MongoCollectionBaseClass
+
+COLLECTION = "blog_posts"
+
+
+def seed(total, batch_size, database):
+    collection = mongo_client[database][COLLECTION]
+    collection.create_indexes([IndexModel([("post_id", ASCENDING)], name="post_id_unique", unique=True)])
+    existing = collection.count_documents({})
+    for start in range(existing, total, batch_size):
+        collection.insert_many(
+            [
+                {
+                    "post_id": f"post_{number}",
+                    "title": f"Post number {number}",
+                    "content": "lorem ipsum dolor sit amet " * 40,
+                    "is_delete": False,
+                    "meta": {"created_by": "user_099", "created_at": 1700000000000 + number},
+                }
+                for number in range(start, min(start + batch_size, total))
+            ]
+        )
+
+
+async def sync_request(collection: MongoCollectionBaseClass, post_id):
+    """
+    An async route calling the blocking pymongo helper, as the handlers did before Motor
+    """
+    return collection.find_one({"post_id": post_id})
+
+
+async def async_request(collection: AsyncMongoCollectionBaseClass, post_id):
+    return await collection.find_one({"post_id": post_id})
+
+
+async def loop_lag(stop, interval=0.001):
+    """
+    Longest time the event loop could not run a task, i.e. how long other requests stalled
+    """
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+async def measure(request, collection, post_ids, concurrency):
+    pending = iter(post_ids)
+    latencies = []
+
+    async def worker():
+        for post_id in pending:
+            start = time.perf_counter()
+            await request(collection, post_id)
+            latencies.append(time.perf_counter() - start)
+
+    stop = asyncio.Event()
+    lag = asyncio.create_task(loop_lag(stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "max_loop_lag_ms": await lag * 1000,
+    }
+
+
+async def run(arguments):
+    seed(arguments.posts, arguments.batch_size, arguments.database)
+    rng = random.Random(arguments.seed)
+    post_ids = [f"post_{rng.randrange(arguments.posts)}" for _ in range(arguments.requests)]
+    sync_collection = MongoCollectionBaseClass(mongo_client, arguments.database, COLLECTION)
+    async_collection = AsyncMongoCollectionBaseClass(async_mongo_client, arguments.database, COLLECTION)
+    # open the connection pools before timing
+    await sync_request(sync_collection, post_ids[0])
+    await async_request(async_collection, post_ids[0])
+    print(f"{arguments.requests:,} find_one by post_id over {arguments.posts:,} posts")
+    print(f"{'driver':<10}{'concurrency':>12}{'req/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'max loop lag ms':>17}")
+    for concurrency in arguments.concurrency:
+        for name, request, collection in (
+            ("pymongo", sync_request, sync_collection),
+            ("motor", async_request, async_collection),
+        ):
+            row = await measure(request, collection, post_ids, concurrency)
+            print(
+                f"{name:<10}{concurrency:>12}{row['rps']:>10,.0f}{row['p50_ms']:>9.2f}"
+                f"{row['p99_ms']:>9.2f}{row['max_loop_lag_ms']:>17.2f}"
+            )
+    if arguments.drop:
+        mongo_client.drop_database(arguments.database)
+
+
+# concurrent request throughput, blocking pymongo on the event loop vs Motor, run against a scratch database
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--database", default="blog_posts_mongo_benchmark", help="Scratch database to seed and query.")
+    ap.add_argument("--posts", type=int, default=100_000, help="Posts to seed, existing posts are reused.")
+    ap.add_argument("--batch-size", type=int, default=10_000, help="Posts per insert_many while seeding.")
+    ap.add_argument("--requests", "-n", type=int, default=20_000, help="find_one calls per measurement.")
+    ap.add_argument("--concurrency", "-c", type=int, nargs="+", default=[1, 10, 50, 200], help="Requests in flight.")
+    ap.add_argument("--seed", type=int, default=7, help="Random seed of the looked up post ids.")
+    ap.add_argument("--drop", action="store_true", help="Drop the scratch database afterwards.")
+    asyncio.run(run(ap.parse_args()))
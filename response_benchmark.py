@@ -0,0 +1,84 @@
+import argparse
+import time
+import tracemalloc
+
+import bson
+from bson.raw_bson import RawBSONDocument
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from scripts.schemas.response_models import DefaultSuccessResponse
+from scripts.utils import mongo_util
+from scripts.utils.response_utils import success_response
+
+
+def synthetic_posts(count):
+    """
+    Returns the posts BSON encoded, as they arrive from the server
+    """
+    return [
+        bson.encode(
+            {
+                "post_id": f"post_{number}",
+                "title": f"Post number {number}",
+                "content": "lorem ipsum dolor sit amet " * 40,
+                "is_delete": False,
+                "meta": {"created_by": "user_099", "created_at": 1700000000000 + number, "tags": ["a", "b"]},
+            }
+        )
+        for number in range(count)
+    ]
+
+
+def model_path(posts):
+    """
+    What FastAPI does with a returned DefaultSuccessResponse and no response_model
+    """
+    records = [bson.decode(post) for post in posts]
+    response = DefaultSuccessResponse(status="success", message="success", data={"records": records})
+    return JSONResponse(content=jsonable_encoder(response)).body
+
+
+def orjson_path(posts):
+    records = [bson.decode(post) for post in posts]
+    return success_response(message="success", data={"records": records}).body
+
+
+def raw_path(posts):
+    records = [RawBSONDocument(post) for post in posts]
+    return success_response(message="success", data={"records": records}, raw=True).body
+
+
+def measure(func, posts, repeat):
+    """
+    Returns milliseconds per call and the peak memory in MB allocated by one call
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(posts)
+    elapsed = (time.perf_counter() - start) * 1000 / repeat
+    tracemalloc.start()
+    func(posts)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+def run(sizes, repeat):
+    paths = {"model": model_path, "orjson": orjson_path, "raw bson": raw_path}
+    print(f"raw bson converter: {'python-bsonjs' if mongo_util.bsonjs else 'bson.json_util (install python-bsonjs)'}")
+    print(f"{'posts':>7}  {'path':<10}{'ms':>10}{'peak MB':>10}{'bytes':>12}")
+    for size in sizes:
+        posts = synthetic_posts(size)
+        for name, func in paths.items():
+            elapsed, peak = measure(func, posts, repeat)
+            print(f"{size:>7,}  {name:<10}{elapsed:>10.2f}{peak:>10.1f}{len(func(posts)):>12,}")
+
+
+# response serialization micro-benchmark: pydantic envelope + jsonable_encoder, orjson and raw BSON
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="Posts per response.")
+    ap.add_argument("--repeat", "-r", type=int, default=10, help="Responses rendered per measurement.")
+    arguments = ap.parse_args()
+    run(arguments.sizes, arguments.repeat)
@@ -20,10 +20,19 @@ class _Service(BaseSettings):
     LOG_LEVEL: str = Field(default="INFO")
     ENABLE_FILE_LOG: Optional[Any] = False
     ENABLE_CONSOLE_LOG: Optional[Any] = True
+    LOG_QUEUE: Optional[bool] = True
+    LOG_QUEUE_SIZE: Optional[int] = 10000
+    LOG_SAMPLE_RATE: Optional[int] = 10
+    LOG_FORMAT: Optional[str] = "text"
+    secure_cookie: Optional[bool] = True
+    SESSION_REFRESH_FRACTION: Optional[float] = 0.5
 
     @root_validator(allow_reuse=True)
     def validate_values(cls, values):
         values["LOG_LEVEL"] = values["LOG_LEVEL"] or "INFO"
+        if not 0 < values["SESSION_REFRESH_FRACTION"] <= 1:
+            print("Error, SESSION_REFRESH_FRACTION must be in (0, 1]")
+            sys.exit(1)
         print(f"Logging Level set to: {values['LOG_LEVEL']}")
         return values
 
@@ -53,6 +62,9 @@ class _PathToStorage(BaseSettings):
 
 class _KeyPath(BaseSettings):
     KEYS_PATH: Optional[pathlib.Path] = Field(default="data/keys")
+    KEY_RELOAD_INTERVAL: Optional[int] = 5
+    ACTIVE_KID: Optional[str] = None
+    VERIFY_ALGORITHMS: Optional[str] = "RS256"
     PUBLIC: Optional[pathlib.Path]
     PRIVATE: Optional[pathlib.Path]
 
@@ -75,6 +87,22 @@ class _Databases(BaseSettings):
     REDIS_URI: Optional[str]
     REDIS_LOGIN_DB: Optional[int] = 14
     REDIS_USER_PERMISSION_DB: Optional[int] = 15
+    REDIS_MAX_CONNECTIONS: Optional[int] = 50
+    REDIS_POOL_TIMEOUT: Optional[int] = 20
+    UNIQUE_ID_BLOCK_SIZE: Optional[int] = 20
+    DEFAULT_PAGE_SIZE: Optional[int] = 100
+    MAX_PAGE_SIZE: Optional[int] = 1000
+    STREAM_BATCH_SIZE: Optional[int] = 500
+    BULK_MAX_POSTS: Optional[int] = 1000
+    MULTI_GET_MAX_IDS: Optional[int] = 100
+    SEARCH_MAX_RESULTS: Optional[int] = 10000
+    RAW_BSON_READS: Optional[bool] = False
+    SLOW_QUERY_MONITORING: Optional[bool] = True
+    SLOW_QUERY_THRESHOLD_MS: Optional[float] = 100
+    SLOW_QUERY_EXPLAIN_INTERVAL: Optional[int] = 60
+    SLOW_QUERY_MAX_SHAPES: Optional[int] = 1000
+    ENSURE_INDEXES_ON_STARTUP: Optional[bool] = True
+    VERIFY_QUERY_PLANS_ON_STARTUP: Optional[bool] = False
 
     @root_validator(allow_reuse=True)
     def validate_values(cls, values):
@@ -87,15 +115,25 @@ class _Databases(BaseSettings):
         return values
 
 
+class _Cache(BaseSettings):
+    TOKEN_CACHE_SIZE: Optional[int] = 10000
+    TOKEN_CACHE_EXPIRY_MARGIN: Optional[int] = 5
+    PERMISSION_CACHE_SIZE: Optional[int] = 10000
+    PERMISSION_CACHE_TTL: Optional[int] = 60
+    PERMISSION_INVALIDATION_CHANNEL: Optional[str] = "user_permissions_invalidation"
+
+
 Service = _Service()
 PathToStorage = _PathToStorage()
 KeyPath = _KeyPath()
 DBConf = _Databases()
+CacheConf = _Cache()
 
 __all__ = [
     "PROJECT_NAME",
     "Service",
     "PathToStorage",
     "KeyPath",
-    "DBConf"
+    "DBConf",
+    "CacheConf",
 ]
@@ -2,6 +2,15 @@ class APIEndpoints:
     # Base Proxies
     proxy_api = "/api"
 
+    # Monitoring
+    metrics = "/metrics"
+
     # Blog Post API's
     api_posts = "/posts"
+    api_posts_bulk = "/posts/bulk"
+    api_posts_batch = "/posts/batch"
+    api_posts_search = "/posts/search"
     api_fetch_all_posts = "/fetch_all_posts"
+
+    # Admin API's
+    api_admin_slow_queries = "/admin/slow_queries"
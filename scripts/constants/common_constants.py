@@ -56,3 +56,17 @@ class Secrets:
     alg = "RS256"
     signature_key = "kliLensKLiLensKL"
     signature_key_alg = ["HS256"]
+
+
+class PermissionOperations:
+    """
+    Bit position of each RBAC operation in the compiled permission masks stored per
+    entity in the user permission hashes. Positions are persisted, only append new ones.
+    """
+
+    BITS = {
+        "view": 0,
+        "create": 1,
+        "edit": 2,
+        "delete": 3,
+    }
@@ -1,5 +1,13 @@
-from scripts.db.mongo import mongo_client
+import time
+from typing import List, Optional
+
+import orjson
+from pymongo.errors import BulkWriteError
+
+from scripts.config import DBConf
+from scripts.db.mongo import async_mongo_client
 from scripts.db.mongo.blog_posts.collections.blog_posts import BlogPostCollection
+from scripts.errors import InputRequestError
 from scripts.logging import logger
 from scripts.schemas.blog_post_schema import BlogPost
 from scripts.utils.common_utils import CommonUtils
@@ -16,59 +24,141 @@ class BlogPostHandler:
         :param : Pass the mongo client to the class
         :return: The following:
         """
-        self.blog_post_conn = BlogPostCollection(mongo_client)
+        self.blog_post_conn = BlogPostCollection(async_mongo_client)
         self.common_utils = CommonUtils()
 
-    def get_post_id_and_meta(self, blog_details, user_id):
+    @staticmethod
+    def get_projection(fields: Optional[str] = None):
+        """
+        Build the Mongo projection for a comma separated list of BlogPost fields.
+
+        Args:
+            fields (Optional[str]): Comma separated field names, e.g. "title,meta". Empty means all fields.
+
+        Returns:
+            Optional[dict]: The projection, always including post_id, or None for full documents.
+
+        Raises:
+            InputRequestError: If a field is not part of the BlogPost schema.
+        """
+        if not fields:
+            return None
+        names = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = names - BlogPost.model_fields.keys()
+        if unknown:
+            raise InputRequestError(f"Unknown fields {sorted(unknown)}, allowed are {list(BlogPost.model_fields)}")
+        return {"_id": 0, "post_id": 1, **{name: 1 for name in names}}
+
+    def get_post_update(self, blog_details: BlogPost, user_id):
         """
-        The get_post_id_and_meta function is used to get the post_id and meta-data for a given step.
-            If the request_data does not contain a post_id, then it will generate one using the common test_utils function
-            get next id. It will also create meta-data for this new step using the common test_utils function get user meta.
-            If there is an existing step with that name, then it raises an error saying so.
+        The get_post_update function builds the single upsert document for a create or update.
+            Post fields and the client supplied meta keys are applied with $set, meta keys one by one so
+            that concurrent updates do not drop each other's meta fields. created_by/created_at are only
+            written when the post is inserted ($setOnInsert), updated_by/updated_at on every write.
 
         :param self: Represent the instance of a class
-        :param blog_details: Get the project_id and post_id from the request
-        :param user_id: Get the user_meta
-        :return: A tuple of post_id and meta
-        """
-        if not blog_details.post_id:
-            post_id = "post_" + self.common_utils.get_next_id("post_id")
-            meta = self.common_utils.get_user_meta(user_id, check_flag=True)
-        else:
-            post_data = self.blog_post_conn.fetch_post_details_by_title(title=blog_details.title)
-            post_data["meta"].update(self.common_utils.get_user_meta(user_id, check_flag=False))
-            meta = post_data["meta"]
-            post_id = blog_details.post_id
-        return post_id, meta
-
-    def save_blog_post_details(self, blog_details: BlogPost, user_id, post_id=None):
+        :param blog_details: The blog post details from the request
+        :param user_id: The user creating or updating the post
+        :return: The update document
+        """
+        now = int(time.time() * 1000)
+        audit_keys = {
+            self.common_utils.KEY_CREATED_BY,
+            self.common_utils.KEY_CREATED_TIME,
+            self.common_utils.KEY_UPDATED_AT,
+            self.common_utils.KEY_LAST_UPDATED_TIME,
+        }
+        set_fields = blog_details.model_dump(exclude={"post_id", "meta"})
+        for key, value in (blog_details.meta or {}).items():
+            if key not in audit_keys:
+                set_fields[f"meta.{key}"] = value
+        set_fields[f"meta.{self.common_utils.KEY_UPDATED_AT}"] = user_id
+        set_fields[f"meta.{self.common_utils.KEY_LAST_UPDATED_TIME}"] = now
+        return {
+            "$set": set_fields,
+            "$setOnInsert": {
+                f"meta.{self.common_utils.KEY_CREATED_BY}": user_id,
+                f"meta.{self.common_utils.KEY_CREATED_TIME}": now,
+            },
+        }
+
+    async def save_blog_post_details(self, blog_details: BlogPost, user_id, post_id=None):
         """
         Save or update blog post details in the database.
 
-        This function retrieves the post ID and metadata for the blog post, then
-        saves the blog post to the database. If a post_id is provided, the post
-        is updated; otherwise, a new post is created.
+        If neither post_id nor blog_details.post_id is given, a new post ID is allocated and the
+        post is created; otherwise the post is updated, or created under that ID if it does not
+        exist. Either way the write is one atomic upsert that returns the stored document.
 
         Args:
             blog_details (BlogPost): The blog post object containing the details to be saved.
             user_id (str): The ID of the user who is creating or updating the blog post.
             post_id (Optional[str]): The ID of the blog post to update (default is None for new posts).
 
+        Returns:
+            dict: The blog post as stored after the write.
+
         Raises:
             Exception: Logs and raises any exception that occurs during the save process.
         """
         try:
-            blog_details.post_id, blog_details.meta = self.get_post_id_and_meta(blog_details, user_id)
-            self.blog_post_conn.update_one_post(data=blog_details.dict(), upsert=True, post_id=post_id)
+            post_id = post_id or blog_details.post_id
+            if not post_id:
+                post_id = "post_" + await self.common_utils.get_next_id("post_id")
+            return await self.blog_post_conn.upsert_post(post_id, self.get_post_update(blog_details, user_id))
         except Exception as e:
             logger.exception(f"exception occurred while saving the blog post {str(e)}")
+            raise
 
-    def fetch_blog_post_details(self, post_id):
+    async def save_blog_posts_bulk(self, posts: List[BlogPost], user_id):
+        """
+        Create or update many blog posts with a single unordered bulk write.
+
+        Post IDs for all new posts are allocated in one call, then every post becomes one
+        upsert in the same bulk write. A failing post does not stop the others.
+
+        Args:
+            posts (List[BlogPost]): The blog posts to create or update, new ones without post_id.
+            user_id (str): The ID of the user who is creating or updating the blog posts.
+
+        Returns:
+            list: One result per post, in request order, with its post_id, status
+                  (created, updated or failed) and the error of failed posts.
+
+        Raises:
+            Exception: Logs and raises any exception other than per-post write errors.
+        """
+        try:
+            new_count = sum(not post.post_id for post in posts)
+            new_ids = iter(await self.common_utils.get_next_ids("post_id", new_count) if new_count else [])
+            post_ids = [post.post_id or "post_" + next(new_ids) for post in posts]
+            try:
+                result = await self.blog_post_conn.bulk_upsert_posts(
+                    (post_id, self.get_post_update(post, user_id)) for post_id, post in zip(post_ids, posts)
+                )
+                upserted, errors = result.upserted_ids, {}
+            except BulkWriteError as e:
+                upserted = {each["index"]: each["_id"] for each in e.details.get("upserted", [])}
+                errors = {each["index"]: each["errmsg"] for each in e.details.get("writeErrors", [])}
+            results = []
+            for index, post_id in enumerate(post_ids):
+                if index in errors:
+                    results.append({"post_id": post_id, "status": "failed", "error": errors[index]})
+                else:
+                    results.append({"post_id": post_id, "status": "created" if index in upserted else "updated"})
+            return results
+        except Exception as e:
+            logger.exception(f"exception occurred while saving the blog posts {str(e)}")
+            raise
+
+    async def fetch_blog_post_details(self, post_id, projection=None, raw=False):
         """
         Retrieve details of a specific blog post from the database.
 
         Args:
             post_id (str): The ID of the blog post to be retrieved.
+            projection (Optional[dict]): Fields to return, see get_projection.
+            raw (bool): Return the post as an undecoded RawBSONDocument.
 
         Returns:
             dict: The blog post details if found, otherwise None.
@@ -77,26 +167,134 @@ class BlogPostHandler:
             Exception: Logs and raises any exception that occurs during the fetch process.
         """
         try:
-            return self.blog_post_conn.find_one({"post_id": post_id})
+            return await self.blog_post_conn.find_one({"post_id": post_id}, filter_dict=projection, raw=raw)
         except Exception as e:
             logger.exception(f"exception occurred while fetching the blog details {str(e)}")
 
-    def fetch_all_blog_posts(self):
+    async def fetch_blog_posts_by_ids(self, post_ids: List[str], projection=None):
         """
-        Retrieve a list of all non-deleted blog posts from the database.
+        Retrieve many blog posts by ID with a single query.
+
+        Args:
+            post_ids (List[str]): The IDs of the blog posts to be retrieved, duplicates are ignored.
+            projection (Optional[dict]): Fields to return, see get_projection.
 
         Returns:
-            list: A list of blog post documents where `is_deleted` is False.
+            dict: The found posts in request order and the IDs that were not found.
 
         Raises:
             Exception: Logs and raises any exception that occurs during the fetch process.
         """
         try:
-            return self.blog_post_conn.find_many({"is_deleted": False})
+            post_ids = list(dict.fromkeys(post_ids))
+            found = {
+                record["post_id"]: record for record in await self.blog_post_conn.find_posts_by_ids(post_ids, filter_dict=projection)
+            }
+            return {
+                "records": [found[post_id] for post_id in post_ids if post_id in found],
+                "missing": [post_id for post_id in post_ids if post_id not in found],
+            }
+        except Exception as e:
+            logger.exception(f"exception occurred while fetching the blog posts {str(e)}")
+            raise
+
+    async def fetch_all_blog_posts(
+        self, page_size=None, continuation_token=None, include_total=False, projection=None, raw=False
+    ):
+        """
+        Retrieve one page of non-deleted blog posts from the database.
+
+        Args:
+            page_size (Optional[int]): Number of posts per page, capped by the configured maximum.
+            continuation_token (Optional[str]): Token returned with the previous page.
+            include_total (bool): Whether to count all non-deleted posts as well.
+            projection (Optional[dict]): Fields to return, see get_projection.
+            raw (bool): Return the posts as undecoded RawBSONDocuments.
+
+        Returns:
+            dict: The posts of the page, the token for the next page and the optional total count.
+
+        Raises:
+            InputRequestError: If the continuation token is malformed.
+            Exception: Logs and raises any other exception that occurs during the fetch process.
+        """
+        try:
+            records, next_token, total = await self.blog_post_conn.find_posts_page(
+                {"is_delete": False},
+                page_size=page_size,
+                continuation_token=continuation_token,
+                include_total=include_total,
+                filter_dict=projection,
+                raw=raw,
+            )
+            return {"records": records, "continuation_token": next_token, "total_count": total}
+        except InputRequestError:
+            raise
         except Exception as e:
             logger.exception(f"exception occurred while fetching the blog posts {str(e)}")
+            raise
+
+    async def search_blog_posts(self, text, page=1, page_size=None, projection=None):
+        """
+        Full-text search over the title and content of non-deleted blog posts.
+
+        Matches in the title weigh ten times more than matches in the content. Results are
+        ordered by relevance, ties by post ID, and paged by page number. Only the first
+        DBConf.SEARCH_MAX_RESULTS results can be paged through.
+
+        Args:
+            text (str): The search text, Mongo $text syntax ("phrases" and -negations).
+            page (int): The 1-based page number.
+            page_size (Optional[int]): Number of posts per page, capped by the configured maximum.
+            projection (Optional[dict]): Fields to return, see get_projection.
+
+        Returns:
+            dict: The posts of the page with their score, the page and whether more pages follow.
+
+        Raises:
+            InputRequestError: If the page lies beyond DBConf.SEARCH_MAX_RESULTS.
+            Exception: Logs and raises any other exception that occurs during the search.
+        """
+        page_size = min(page_size or DBConf.DEFAULT_PAGE_SIZE, DBConf.MAX_PAGE_SIZE)
+        skip = (page - 1) * page_size
+        if skip >= DBConf.SEARCH_MAX_RESULTS:
+            raise InputRequestError(f"Only the first {DBConf.SEARCH_MAX_RESULTS} search results can be paged")
+        try:
+            records = await self.blog_post_conn.search_posts(
+                text, skip=skip, limit=page_size + 1, filter_dict=projection
+            )
+            has_more = len(records) > page_size and skip + page_size < DBConf.SEARCH_MAX_RESULTS
+            return {"records": records[:page_size], "page": page, "page_size": page_size, "has_more": has_more}
+        except Exception as e:
+            logger.exception(f"exception occurred while searching the blog posts {str(e)}")
+            raise
+
+    async def stream_all_blog_posts(self, projection=None):
+        """
+        Stream all non-deleted blog posts as newline-delimited JSON.
+
+        The Mongo cursor is read DBConf.STREAM_BATCH_SIZE documents at a time and every batch
+        is yielded as one chunk as soon as it arrives, so memory stays flat for any result size.
+
+        Args:
+            projection (Optional[dict]): Fields to return, see get_projection.
+
+        Yields:
+            bytes: One NDJSON chunk per cursor batch.
+        """
+        cursor = self.blog_post_conn.iter_posts(
+            {"is_delete": False}, batch_size=DBConf.STREAM_BATCH_SIZE, filter_dict=projection
+        )
+        try:
+            while documents := await cursor.to_list(length=DBConf.STREAM_BATCH_SIZE):
+                yield b"".join(orjson.dumps(document, default=str) + b"\n" for document in documents)
+        except Exception as e:
+            logger.exception(f"exception occurred while streaming the blog posts {str(e)}")
+            raise
+        finally:
+            await cursor.close()
 
-    def delete_blog_post(self, post_id):
+    async def delete_blog_post(self, post_id):
         """
         Delete a specific blog post from the database.
 
@@ -107,6 +305,6 @@ class BlogPostHandler:
             Exception: Logs and raises any exception that occurs during the deletion process.
         """
         try:
-            self.blog_post_conn.delete_one_post(post_id=post_id)
+            await self.blog_post_conn.delete_one_post(post_id=post_id)
         except Exception as e:
             logger.exception(f"exception occurred while deleting the post {str(e)}")
@@ -1,4 +1,15 @@
 from scripts.config import DBConf
-from scripts.utils.mongo_util import MongoConnect
+from scripts.utils.mongo_util import AsyncMongoConnect, MongoConnect
+from scripts.utils.query_monitor import SlowQueryMonitor
 
-mongo_client = MongoConnect(uri=DBConf.MONGO_URI)()
\ No newline at end of file
+mongo_client = MongoConnect(uri=DBConf.MONGO_URI)()
+# explains run on the unmonitored sync client, so they never show up as slow queries themselves
+slow_query_monitor = SlowQueryMonitor(
+    threshold_ms=DBConf.SLOW_QUERY_THRESHOLD_MS,
+    explain_client=mongo_client,
+    explain_interval=DBConf.SLOW_QUERY_EXPLAIN_INTERVAL,
+    max_shapes=DBConf.SLOW_QUERY_MAX_SHAPES,
+)
+async_mongo_client = AsyncMongoConnect(
+    uri=DBConf.MONGO_URI, event_listeners=[slow_query_monitor] if DBConf.SLOW_QUERY_MONITORING else None
+)()
@@ -3,7 +3,9 @@ from typing import Any, Dict, List, Optional
 
 from scripts.constants.db_constants import DBConstants, DatabaseNames
 from pydantic import BaseModel
-from scripts.utils.mongo_util import MongoCollectionBaseClass
+from pymongo import ASCENDING, TEXT, IndexModel, UpdateOne
+from scripts.utils.metrics import timed_mongo_operation
+from scripts.utils.mongo_util import AsyncMongoCollectionBaseClass
 
 
 class BlogPostSchema(BaseModel):
@@ -11,14 +13,34 @@ class BlogPostSchema(BaseModel):
     This is the Schema for the Mongo DB Collection.
     All datastore and general responses will be following the schema.
     """
-    post_id: Optional[int] = None  # ID will be assigned automatically
+    post_id: Optional[str] = None  # ID will be assigned automatically
     title: str
     meta: Optional[dict] = {}
     content: Optional[str] = ""
     is_delete: bool = False
 
 
-class BlogPostCollection(MongoCollectionBaseClass):
+class BlogPostCollection(AsyncMongoCollectionBaseClass):
+    indexes = [
+        IndexModel([("post_id", ASCENDING)], name="post_id_unique", unique=True),
+        IndexModel([("title", ASCENDING)], name="title"),
+        IndexModel([("is_delete", ASCENDING), ("post_id", ASCENDING)], name="is_delete_post_id"),
+        # is_delete is an equality prefix, so every $text query must also filter on it
+        IndexModel(
+            [("is_delete", ASCENDING), ("title", TEXT), ("content", TEXT)],
+            name="is_delete_title_content_text",
+            weights={"title": 10, "content": 1},
+        ),
+    ]
+    query_shapes = [
+        {"filter": {"post_id": "post_100"}},
+        {"filter": {"post_id": {"$in": ["post_100", "post_101"]}}},
+        {"filter": {"title": "title"}},
+        {"filter": {"is_delete": False}, "sort": [("post_id", ASCENDING)]},
+        {"filter": {"$and": [{"is_delete": False}, {"post_id": {"$gt": "post_100"}}]}, "sort": [("post_id", ASCENDING)]},
+        {"filter": {"is_delete": False, "$text": {"$search": "title"}}, "sort": [("score", {"$meta": "textScore"})]},
+    ]
+
     def __init__(self, mongo_client):
         super().__init__(mongo_client, database=DatabaseNames.blog_posts, collection=DBConstants.collection_blog_posts)
 
@@ -26,7 +48,7 @@ class BlogPostCollection(MongoCollectionBaseClass):
     def key_post_id(self):
         return "post_id"
 
-    def insert_one_post(self, data):
+    async def insert_one_post(self, data):
         """
         The following function will insert one tag in the
         tags collections
@@ -34,9 +56,9 @@ class BlogPostCollection(MongoCollectionBaseClass):
         :param data:
         :return:
         """
-        return self.insert_one(data)
+        return await self.insert_one(data)
 
-    def update_one_post(self, data, upsert=False, **query):
+    async def update_one_post(self, data, upsert=False, **query):
         """
         The following function will update one step in
         steps collection based on the given query
@@ -45,45 +67,134 @@ class BlogPostCollection(MongoCollectionBaseClass):
         :param query:
         :return:
         """
-        return self.update_one(data=data, upsert=upsert, query=query)
+        return await self.update_one(data=data, upsert=upsert, query=query)
+
+    async def upsert_post(self, post_id, update):
+        """
+        The following function will apply the update to the post with
+        the given post_id, inserting it if missing, in one round trip
+        :param post_id:
+        :param update:
+        :return: the post after the update
+        """
+        return await self.find_one_and_update(query={self.key_post_id: post_id}, update=update, upsert=True)
 
-    def delete_one_post(self, **query):
+    async def bulk_upsert_posts(self, updates):
+        """
+        The following function will upsert many posts with one unordered
+        bulk write, given (post_id, update) pairs
+        :param updates:
+        :return:
+        """
+        return await self.bulk_write(
+            [UpdateOne({self.key_post_id: post_id}, update, upsert=True) for post_id, update in updates],
+            ordered=False,
+        )
+
+    async def delete_one_post(self, **query):
         """
         The following function will delete one tag in
         tags collection based on the given query
         :param query:
         :return:
         """
-        return self.delete_one(query=query)
+        return await self.delete_one(query=query)
 
-    def find_many(self, query):
+    @timed_mongo_operation
+    async def find_many(self, query):
         """
         The following function will give one process for a given set of
         search parameters as keyword arguments
         :return:
         """
         many_posts = self.find(query=query)
-        if not many_posts:
-            return []
-        return list(many_posts)
+        return await many_posts.to_list(length=None)
+
+    @timed_mongo_operation
+    async def find_posts_by_ids(self, post_ids, filter_dict=None):
+        """
+        The following function will give all posts whose post_id is in
+        the given list, with one $in query
+        :param post_ids:
+        :param filter_dict:
+        :return:
+        """
+        cursor = self.find(query={self.key_post_id: {"$in": list(post_ids)}}, filter_dict=filter_dict)
+        return await cursor.to_list(length=None)
+
+    async def find_posts_page(
+        self, query, page_size=None, continuation_token=None, include_total=False, filter_dict=None, raw=False
+    ):
+        """
+        The following function will give one page of posts ordered by
+        post_id, resuming after the given continuation token
+        :param query:
+        :param page_size:
+        :param continuation_token:
+        :param include_total:
+        :param filter_dict:
+        :param raw:
+        :return:
+        """
+        return await self.find_page(
+            query=query,
+            sort_key=self.key_post_id,
+            page_size=page_size,
+            continuation_token=continuation_token,
+            filter_dict=filter_dict,
+            include_total=include_total,
+            raw=raw,
+        )
+
+    @timed_mongo_operation
+    async def search_posts(self, text, skip=0, limit=None, filter_dict=None):
+        """
+        The following function will give the non-deleted posts matching the
+        search text, best text score first. Every document carries its score
+        :param text:
+        :param skip:
+        :param limit:
+        :param filter_dict:
+        :return:
+        """
+        score = {"$meta": "textScore"}
+        cursor = self.find(
+            query={"is_delete": False, "$text": {"$search": text}},
+            filter_dict={**(filter_dict or {"_id": 0}), "score": score},
+            sort=[("score", score), (self.key_post_id, ASCENDING)],
+            skip=skip,
+            limit=limit,
+        )
+        return await cursor.to_list(length=None)
+
+    def iter_posts(self, query, batch_size=None, filter_dict=None):
+        """
+        The following function will give a cursor over all posts matching
+        the query ordered by post_id, fetched batch_size documents at a time
+        :param query:
+        :param batch_size:
+        :param filter_dict:
+        :return:
+        """
+        return self.find(query=query, filter_dict=filter_dict, sort=[(self.key_post_id, 1)], batch_size=batch_size)
 
-    def find_by_id(self, post_id: str):
+    async def find_by_id(self, post_id: str):
         query = {self.key_post_id: post_id}
-        record = self.find_one(query)
+        record = await self.find_one(query)
         if not record:
             return BlogPostSchema(**{})
         return BlogPostSchema(**record)
 
-    def fetch_post_details(self, post_id):
+    async def fetch_post_details(self, post_id):
         query = {self.key_post_id: post_id}
-        one_post = self.find_one(query=query)
+        one_post = await self.find_one(query=query)
         if not one_post:
             return BlogPostSchema(**{})
         return BlogPostSchema(**one_post)
 
-    def fetch_post_details_by_title(self, title):
+    async def fetch_post_details_by_title(self, title):
         query = {"title": title}
-        one_post = self.find_one(query=query)
+        one_post = await self.find_one(query=query)
         if not one_post:
             return BlogPostSchema(**{})
         return BlogPostSchema(**one_post)
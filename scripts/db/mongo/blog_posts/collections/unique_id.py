@@ -1,7 +1,8 @@
 from typing import Optional
 from pydantic import BaseModel
+from pymongo import ASCENDING, IndexModel
 from scripts.constants.db_constants import DBConstants, DatabaseNames
-from scripts.utils.mongo_util import MongoCollectionBaseClass
+from scripts.utils.mongo_util import AsyncMongoCollectionBaseClass
 
 
 class UniqueIdSchema(BaseModel):
@@ -14,7 +15,10 @@ class UniqueIdSchema(BaseModel):
     id: Optional[str] = ""
 
 
-class UniqueId(MongoCollectionBaseClass):
+class UniqueId(AsyncMongoCollectionBaseClass):
+    indexes = [IndexModel([("key", ASCENDING)], name="key_unique", unique=True)]
+    query_shapes = [{"filter": {"key": "post_id"}}]
+
     def __init__(self, mongo_client):
         super().__init__(mongo_client, database=DatabaseNames.blog_posts, collection=DBConstants.collection_unique_id)
 
@@ -22,32 +26,62 @@ class UniqueId(MongoCollectionBaseClass):
     def key_key(self):
         return "key"
 
-    def find_one_record(self, **kwargs):
+    async def find_one_record(self, **kwargs):
         """
         The following function will give one record for a given set of
         search parameters as keyword arguments
         :param kwargs:
         :return:
         """
-        record = self.find_one(query=kwargs)
+        record = await self.find_one(query=kwargs)
         return UniqueIdSchema(**record) if record else UniqueIdSchema()
 
-    def insert_record(self, record: UniqueIdSchema):
+    async def insert_record(self, record: UniqueIdSchema):
         """
         The following function will give one record for a given set of
         search parameters as keyword arguments
         :param record:
         :return:
         """
-        self.insert_one(record.dict())
+        await self.insert_one(record.dict())
         return record.id
 
-    def update_record(self, record: UniqueIdSchema):
+    async def update_record(self, record: UniqueIdSchema):
         """
         The following function will give one record for a given set of
         search parameters as keyword arguments
         :param record:
         :return:
         """
-        self.update_one(query={self.key_key: record.key}, data=record.dict())
+        await self.update_one(query={self.key_key: record.key}, data=record.dict())
         return record.id
+
+    async def reserve_block(self, key: str, size: int = 1) -> int:
+        """
+        Atomically advances the counter for `key` by `size` in one round trip and
+        returns the new high-water mark, so the caller owns ids (high - size, high].
+        Counters are kept as strings for compatibility with existing records and a
+        missing counter starts at 100, like the original generator.
+        :param key:
+        :param size:
+        :return:
+        """
+        record = await self.find_one_and_update(
+            query={self.key_key: key},
+            update=[
+                {
+                    "$set": {
+                        "id": {
+                            "$toString": {
+                                "$add": [
+                                    {"$convert": {"input": "$id", "to": "long", "onError": 99, "onNull": 99}},
+                                    size,
+                                ]
+                            }
+                        }
+                    }
+                }
+            ],
+            upsert=True,
+        )
+        return int(record["id"])
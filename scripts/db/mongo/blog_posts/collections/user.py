@@ -2,7 +2,8 @@ import re
 from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel
-from scripts.utils.mongo_util import MongoCollectionBaseClass
+from pymongo import ASCENDING, IndexModel
+from scripts.utils.mongo_util import AsyncMongoCollectionBaseClass
 
 from scripts.constants.db_constants import DBConstants, DatabaseNames
 
@@ -73,14 +74,26 @@ class UserSchema(BaseModel):
     shift_details: Optional[dict] = {}
 
 
-class User(MongoCollectionBaseClass):
+class User(AsyncMongoCollectionBaseClass):
+    indexes = [
+        IndexModel([("user_id", ASCENDING), ("project_id", ASCENDING)], name="user_id_project_id"),
+        IndexModel([("username", ASCENDING)], name="username"),
+        IndexModel([("email", ASCENDING)], name="email"),
+    ]
+    query_shapes = [
+        {"filter": {"user_id": "user_099"}},
+        {"filter": {"username": "username"}},
+        {"filter": {"email": "email"}},
+        {"filter": {"user_id": "user_099", "project_id": "project_099"}},
+    ]
+
     def __init__(self, mongo_client):
         super().__init__(mongo_client, database=DatabaseNames.blog_posts, collection=DBConstants.collection_user)
         self.key_user_id = UserCollectionKeys.KEY_USER_ID
         self.key_username = UserCollectionKeys.KEY_USERNAME
         self.key_email = UserCollectionKeys.KEY_EMAIL
 
-    def find_user(self, user_id=None, username=None, email=None, filter_dict=None):
+    async def find_user(self, user_id=None, username=None, email=None, filter_dict=None):
         query = {}
         if user_id:
             query[self.key_user_id] = user_id
@@ -89,7 +102,7 @@ class User(MongoCollectionBaseClass):
         if email:
             query[self.key_email] = re.compile(email, re.IGNORECASE)
             query[self.key_email] = email
-        user = self.find_one(query=query, filter_dict=filter_dict)
+        user = await self.find_one(query=query, filter_dict=filter_dict)
         if user:
             return UserSchema(**user)
         return UserSchema(**{})
@@ -112,19 +125,17 @@ class User(MongoCollectionBaseClass):
     def users_list_by_aggregate(self, query: list):
         return self.aggregate(pipelines=query)
 
-    def find_user_by_project_id(self, user_id, project_id):
-        user = self.find_one(query={self.key_user_id: user_id, self.key_project_id: project_id})
+    async def find_user_by_project_id(self, user_id, project_id):
+        user = await self.find_one(query={self.key_user_id: user_id, self.key_project_id: project_id})
         if user:
             return dict(user)
         return user
 
-    def get_all_users(self, filter_dict=None, sort=None, skip=0, limit=None, **query):
+    async def get_all_users(self, filter_dict=None, sort=None, skip=0, limit=None, **query):
         users = self.find(filter_dict=filter_dict, sort=sort, skip=skip, limit=limit, query=query)
-        if users:
-            return list(users)
-        return []
+        return await users.to_list(length=None)
 
-    def find_user_role_for_user_id(self, user_id, project_id):
+    async def find_user_role_for_user_id(self, user_id, project_id):
         query = {"user_id": user_id, "project_id": project_id}
         filter_dict = {"userrole": 1, "_id": 0}
-        return self.find_one(query=query, filter_dict=filter_dict)
+        return await self.find_one(query=query, filter_dict=filter_dict)
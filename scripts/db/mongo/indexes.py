@@ -0,0 +1,69 @@
+import argparse
+import asyncio
+import sys
+from typing import Dict
+
+from scripts.db.mongo import async_mongo_client
+from scripts.db.mongo.blog_posts.collections.blog_posts import BlogPostCollection
+from scripts.db.mongo.blog_posts.collections.unique_id import UniqueId
+from scripts.db.mongo.blog_posts.collections.user import User
+from scripts.errors import QueryPlanError
+from scripts.logging import logger
+from scripts.utils.mongo_util import plan_stages
+
+COLLECTION_CLASSES = [BlogPostCollection, UniqueId, User]
+
+
+async def ensure_indexes(mongo_client=async_mongo_client) -> Dict[str, str]:
+    """
+    Creates the indexes declared by every collection class. Safe to run on every start,
+    existing indexes are left untouched. Failures are returned per collection, startup
+    refuses to serve with any of them.
+    """
+    failures = {}
+    for collection_class in COLLECTION_CLASSES:
+        collection = collection_class(mongo_client)
+        try:
+            names = await collection.create_indexes()
+            logger.info(f"Indexes ensured on {collection.collection}: {names}")
+        except Exception as e:
+            failures[collection.collection] = str(e)
+    return failures
+
+
+async def verify_query_plans(mongo_client=async_mongo_client):
+    """
+    Explains every declared query shape and raises QueryPlanError listing the shapes
+    whose winning plan contains a COLLSCAN.
+    """
+    collection_scans = []
+    for collection_class in COLLECTION_CLASSES:
+        collection = collection_class(mongo_client)
+        for shape in collection.query_shapes:
+            explain = await collection.explain(shape["filter"], sort=shape.get("sort"))
+            if "COLLSCAN" in plan_stages(explain.get("queryPlanner", {}).get("winningPlan", {})):
+                collection_scans.append(f"{collection.collection}: {shape}")
+    if collection_scans:
+        raise QueryPlanError(f"Collection scans detected for {collection_scans}")
+    logger.info("All declared query shapes are index backed")
+
+
+async def main(check=False):
+    failures = await ensure_indexes()
+    if failures:
+        logger.error(f"Index creation failed for {failures}")
+        return 1
+    if check:
+        try:
+            await verify_query_plans()
+        except QueryPlanError as e:
+            logger.error(str(e))
+            return 1
+    return 0
+
+
+# python -m scripts.db.mongo.indexes [--check]
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--check", action="store_true", help="Fail if any declared query shape does a COLLSCAN.")
+    sys.exit(asyncio.run(main(check=ap.parse_args().check)))
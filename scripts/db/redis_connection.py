@@ -1,6 +1,32 @@
 import redis
+import redis.asyncio as aioredis
 
 from scripts.config import DBConf
 
 login_db = redis.from_url(DBConf.REDIS_URI, db=int(DBConf.REDIS_LOGIN_DB), decode_responses=True)
-user_permissions_redis = redis.from_url(DBConf.REDIS_URI, db=int(DBConf.REDIS_USER_PERMISSION_DB), decode_responses=True)
\ No newline at end of file
+user_permissions_redis = redis.from_url(DBConf.REDIS_URI, db=int(DBConf.REDIS_USER_PERMISSION_DB), decode_responses=True)
+
+_async_pools = {}
+
+
+def get_async_redis(uri: str, db: int) -> aioredis.Redis:
+    """
+    Returns an asyncio redis client sharing one bounded connection pool per (uri, db).
+    Once REDIS_MAX_CONNECTIONS are checked out, callers wait up to REDIS_POOL_TIMEOUT
+    seconds for a free connection instead of opening new sockets.
+    """
+    pool = _async_pools.get((uri, db))
+    if pool is None:
+        pool = aioredis.BlockingConnectionPool.from_url(
+            uri,
+            db=db,
+            decode_responses=True,
+            max_connections=int(DBConf.REDIS_MAX_CONNECTIONS),
+            timeout=DBConf.REDIS_POOL_TIMEOUT,
+        )
+        _async_pools[(uri, db)] = pool
+    return aioredis.Redis(connection_pool=pool)
+
+
+async_login_db = get_async_redis(DBConf.REDIS_URI, int(DBConf.REDIS_LOGIN_DB))
+async_user_permissions_redis = get_async_redis(DBConf.REDIS_URI, int(DBConf.REDIS_USER_PERMISSION_DB))
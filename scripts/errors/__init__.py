@@ -3,6 +3,8 @@ class ErrorMessages:
     ERR001 = "Configurations not available, please verify the database."
     ERR002 = "Data Not Found"
     ERR003 = "User Record Not Found"
+    ERROR002 = "Signature Expired"
+    ERROR003 = "Signature Not Valid"
     LOOKUPSERROR = "Could not find scadas configured in lookups for this app"
     SELECTEDDETAILSERROR = "Could not find selected all details"
     INCORRECTDETAILS = "Incorrect details"
@@ -91,5 +93,17 @@ class UserRoleNotFoundException(Exception):
     pass
 
 
+class QueryPlanError(Exception):
+    """
+    Raised when a declared query shape is planned as a collection scan
+    """
+
+
+class IndexCreationError(Exception):
+    """
+    Raised when the declared indexes of a collection could not be created
+    """
+
+
 class CustomAppError:
     FAILED_TO_SAVE = "Failed to save app"
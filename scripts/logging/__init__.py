@@ -1,8 +1,15 @@
+import atexit
+import copy
 import logging
 import os
+import queue
+import reprlib
+import sys
+import threading
 from logging import StreamHandler
-from logging.handlers import RotatingFileHandler, SocketHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, SocketHandler
 
+import orjson
 import yaml
 
 from scripts.config import PathToStorage, Service
@@ -26,6 +33,34 @@ config = read_configuration("scripts/logging/logger_conf.yml")
 logging_config = config["logger"]
 logging_config["level"] = Service.LOG_LEVEL
 
+trace_repr = reprlib.Repr()
+trace_repr.maxlevel = 4
+trace_repr.maxdict = 12
+trace_repr.maxlist = 12
+trace_repr.maxstring = 120
+trace_repr.maxother = 120
+
+
+class TraceSummary:
+    """
+    Wraps a logged query/document so its repr is only built when a handler formats the
+    record, and then truncated (long strings, big dicts and lists are elided with `...`).
+    Pass it as a %-style argument: logger.qtrace("%s, %s", collection, TraceSummary(query))
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        return trace_repr.repr(self.value)
+
+
+# Since 3.11 findCaller counts stacklevel from the first frame outside the logging module,
+# the wrapper of a custom level has to step over itself there; before, it already is skipped
+CALLER_STACKLEVEL = 2 if sys.version_info >= (3, 11) else 1
+
 
 def add_logging_level(level_name, level_num, method_name=None):
     """
@@ -63,6 +98,7 @@ def add_logging_level(level_name, level_num, method_name=None):
 
     def log_for_level(self, message, *args, **kwargs):
         if self.isEnabledFor(level_num):
+            kwargs.setdefault("stacklevel", CALLER_STACKLEVEL)
             self._log(level_num, message, args, **kwargs)
 
     def log_to_root(message, *args, **kwargs):
@@ -74,6 +110,99 @@ def add_logging_level(level_name, level_num, method_name=None):
     setattr(logging, method_name, log_to_root)
 
 
+class JsonLineFormatter(logging.Formatter):
+    """
+    Compact one-line JSON records for log collectors
+    """
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "thread": record.threadName,
+            "func": record.funcName,
+            "line": record.lineno,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return orjson.dumps(entry, default=str).decode()
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Hands records to a bounded queue without ever blocking the caller.
+
+    Once the queue is `sample_from` full only WARNING and above plus every `sample_rate`-th
+    lower record are queued; a full queue drops the record. Drops are counted in `dropped`
+    and reported with one WARNING record as soon as the queue has room again.
+    """
+
+    def __init__(self, log_queue: queue.Queue, sample_from: float = 0.8, sample_rate: int = 10):
+        super().__init__(log_queue)
+        self.sample_threshold = int(log_queue.maxsize * sample_from)
+        self.sample_rate = sample_rate
+        self.dropped = 0
+        self._sampled = 0
+        self._unreported = 0
+        self._count_lock = threading.Lock()
+        self.exception_formatter = logging.Formatter()
+
+    def _drop(self):
+        with self._count_lock:
+            self.dropped += 1
+            self._unreported += 1
+
+    def emit(self, record):
+        if record.levelno < logging.WARNING and self.queue.qsize() >= self.sample_threshold:
+            self._sampled += 1
+            if self._sampled % self.sample_rate:
+                self._drop()
+                return
+        if self._unreported and self.queue.qsize() < self.sample_threshold:
+            with self._count_lock:
+                unreported, self._unreported = self._unreported, 0
+            self.enqueue(
+                logging.makeLogRecord(
+                    {
+                        "name": record.name,
+                        "levelno": logging.WARNING,
+                        "levelname": "WARNING",
+                        "msg": f"Log queue overloaded, dropped {unreported} records ({self.dropped} in total)",
+                        "funcName": "emit",
+                    }
+                )
+            )
+        super().emit(record)
+
+    def prepare(self, record):
+        """
+        Merges the arguments into the message on the calling thread but keeps the traceback
+        in `exc_text`, so the listener's formatter decides how to render it
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.exception_formatter.formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self._drop()
+
+
+class BoundedQueueListener(QueueListener):
+    def enqueue_sentinel(self):
+        # the listener keeps draining, so waiting for a free slot on shutdown is safe
+        self.queue.put(self._sentinel)
+
+
 def get_logger():
     """
     Creates a rotating log
@@ -84,7 +213,11 @@ def get_logger():
     log_formatter = "%(asctime)s - %(levelname)-6s - [%(threadName)5s:%(funcName)5s():" + "%(lineno)s] - %(message)s"
     time_format = "%Y-%m-%d %H:%M:%S"
     file_path = PathToStorage.LOGS_MODULE_PATH
-    formatter = logging.Formatter(log_formatter, time_format)
+    if Service.LOG_FORMAT == "json":
+        formatter = JsonLineFormatter(datefmt=time_format)
+    else:
+        formatter = logging.Formatter(log_formatter, time_format)
+    handlers = []
 
     for each_handler in logging_config["handlers"]:
         if each_handler["type"] in ["RotatingFileHandler"] and Service.ENABLE_FILE_LOG:
@@ -103,7 +236,18 @@ def get_logger():
         else:
             temp_handler = None
         if temp_handler:
-            __logger__.addHandler(temp_handler)
+            handlers.append(temp_handler)
+
+    if Service.LOG_QUEUE and handlers:
+        # records are formatted on the calling thread, the handlers write from the listener thread
+        log_queue = queue.Queue(maxsize=Service.LOG_QUEUE_SIZE)
+        listener = BoundedQueueListener(log_queue, *handlers, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+        __logger__.addHandler(BoundedQueueHandler(log_queue, sample_rate=Service.LOG_SAMPLE_RATE))
+    else:
+        for each_handler in handlers:
+            __logger__.addHandler(each_handler)
 
     return __logger__
 
@@ -4,7 +4,7 @@ from pydantic import BaseModel
 
 
 class BlogPost(BaseModel):
-    post_id: Optional[int] = None  # ID will be assigned automatically
+    post_id: Optional[str] = None  # ID will be assigned automatically
     title: str
     meta: Optional[dict] = {}
     content: Optional[str] = ""
@@ -1,7 +1,11 @@
 from fastapi import APIRouter
 
+from scripts.services.admin_manager import admin_router
 from scripts.services.blog_post_manager import blog_post_router
+from scripts.services.metrics_manager import metrics_router
 
 router = APIRouter()
 
 router.include_router(blog_post_router)
+router.include_router(admin_router)
+router.include_router(metrics_router)
@@ -0,0 +1,54 @@
+import traceback
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+
+from scripts.config import DBConf
+from scripts.constants.app_constants import APIEndpoints
+from scripts.db.mongo import slow_query_monitor
+from scripts.logging import logger
+from scripts.utils.metrics import TimedRoute
+from scripts.utils.response_utils import failure_response, success_response
+from scripts.utils.security_utils.rbac import RBAC
+
+entity_name = "admin"
+admin_router = APIRouter(prefix=APIEndpoints.proxy_api, tags=["Admin"], route_class=TimedRoute)
+
+
+# GET /api/admin/slow_queries - Slowest Mongo query shapes seen by this process
+@admin_router.get(
+    APIEndpoints.api_admin_slow_queries,
+    dependencies=[Depends(RBAC(entity_name=entity_name, operation=["view"], require_grant=True))],
+)
+async def get_slow_queries(
+    top_n: int = Query(10, gt=0, le=1000, description="Number of query shapes to return"),
+    sort_by: Literal["avg_ms", "max_ms", "total_ms"] = Query("avg_ms", description="Statistic to rank the shapes by"),
+):
+    """
+    Retrieve the slowest Mongo query shapes recorded by the command listener of this process.
+
+    Queries are grouped by collection, operation and normalized filter/sort, so the same query
+    with different values counts as one shape. Shapes with slow executions carry the summary
+    of their last explained query plan. Only users explicitly granted view on the admin
+    entity may read them.
+
+    Args:
+        top_n (int): Number of query shapes to return.
+        sort_by (str): Statistic to rank the shapes by, avg_ms, max_ms or total_ms.
+
+    Returns:
+        JSONResponse: Success response with the threshold and the ranked shapes, or failure
+                      response in case of exceptions.
+    """
+    try:
+        response = {
+            "monitoring": DBConf.SLOW_QUERY_MONITORING,
+            "threshold_ms": slow_query_monitor.threshold_ms,
+            "untracked": slow_query_monitor.untracked,
+            "shapes": slow_query_monitor.top(top_n, sort_by=sort_by),
+        }
+        return success_response(message="Slow Queries", data=response)
+    except Exception as e:
+        tb = traceback.format_exc()
+        logger.exception(tb)
+        return failure_response(error=e.args, message=str(e))
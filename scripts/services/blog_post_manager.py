@@ -1,23 +1,24 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 import traceback
+from scripts.config import DBConf
+from scripts.errors import InputRequestError
 from scripts.schemas.blog_post_schema import BlogPost
-from typing import Union, Any
+from typing import List, Optional, Union, Any
 from scripts.constants.app_constants import APIEndpoints
 from scripts.core.handlers.blog_post_handler import BlogPostHandler
 from scripts.logging import logger
-from scripts.schemas.response_models import (
-    DefaultFailureResponse,
-    DefaultSuccessResponse, DefaultResponse,
-)
 from fastapi.encoders import jsonable_encoder
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import ValidationError as PydanticValidationError
+from scripts.utils.metrics import TimedRoute
+from scripts.utils.mongo_util import RAW_BSON_READS
+from scripts.utils.response_utils import default_response, failure_response, success_response
 from scripts.utils.security_utils.project_decorator import MetaInfoCookie, MetaInfoSchema
 from scripts.utils.security_utils.rbac import RBAC
 
 get_cookies = MetaInfoCookie()
 entity_name = "blog_post"
-blog_post_router = APIRouter(prefix=APIEndpoints.proxy_api, tags=["App Related Services"])
+blog_post_router = APIRouter(prefix=APIEndpoints.proxy_api, tags=["App Related Services"], route_class=TimedRoute)
 
 
 # POST /api/posts - Create a new blog post
@@ -41,8 +42,8 @@ async def create_post(post: BlogPost, meta: MetaInfoSchema = Depends(get_cookies
         Exception: Logs and raises any other general exception.
     """
     try:
-        BlogPostHandler().save_blog_post_details(post, meta.user_id)
-        return DefaultSuccessResponse(status="success", message="Blog Created Successfully", data=None)
+        response = await BlogPostHandler().save_blog_post_details(post, meta.user_id)
+        return success_response(message="Blog Created Successfully", data=response)
     except PydanticValidationError as validation_error:
         return JSONResponse(
             status_code=422,
@@ -51,12 +52,54 @@ async def create_post(post: BlogPost, meta: MetaInfoSchema = Depends(get_cookies
     except Exception as e:
         tb = traceback.format_exc()
         logger.exception(tb)
-        return DefaultFailureResponse(error=e.args, message=e.args)
+        return failure_response(error=e.args, message=str(e))
+
+
+# POST /api/posts/bulk - Create or update many blog posts at once
+@blog_post_router.post(APIEndpoints.api_posts_bulk, dependencies=[Depends(RBAC(entity_name=entity_name, operation=["view", "create", "edit"]))])
+async def bulk_save_posts(posts: List[BlogPost], meta: MetaInfoSchema = Depends(get_cookies)):
+    """
+    Create or update many blog posts in one request.
+
+    Posts without a post_id are created, posts with one are updated (or created under that ID).
+    All posts are written with a single unordered bulk write, so one failing post does not
+    stop the rest.
+
+    Args:
+        posts (List[BlogPost]): The blog posts to create or update, at most DBConf.BULK_MAX_POSTS.
+        meta (MetaInfoSchema): User's metadata (automatically populated from cookies).
+
+    Returns:
+        JSONResponse: Success response with one result per post in request order, holding its
+                      post_id and status (created, updated or failed, with the error), or
+                      validation errors and failure response in case of exceptions.
+
+    Raises:
+        PydanticValidationError: If input validation fails for the blog post data.
+        Exception: Logs and raises any other general exception.
+    """
+    if not posts or len(posts) > DBConf.BULK_MAX_POSTS:
+        return JSONResponse(
+            status_code=422,
+            content={"detail": f"Between 1 and {DBConf.BULK_MAX_POSTS} posts are accepted per request"},
+        )
+    try:
+        response = await BlogPostHandler().save_blog_posts_bulk(posts, meta.user_id)
+        return success_response(message="Blogs Saved", data=response)
+    except PydanticValidationError as validation_error:
+        return JSONResponse(
+            status_code=422,
+            content={"detail": jsonable_encoder(validation_error.errors())},
+        )
+    except Exception as e:
+        tb = traceback.format_exc()
+        logger.exception(tb)
+        return failure_response(error=e.args, message=str(e))
 
 
 # PUT /api/posts/{id} - Update an existing blog post
 @blog_post_router.put(APIEndpoints.api_posts, dependencies=[Depends(RBAC(entity_name=entity_name, operation=["view", "create", "edit"]))])
-async def update_post(post_id: str, updated_post: BlogPost):
+async def update_post(post_id: str, updated_post: BlogPost, meta: MetaInfoSchema = Depends(get_cookies)):
     """
     Update an existing blog post.
 
@@ -65,6 +108,7 @@ async def update_post(post_id: str, updated_post: BlogPost):
     Args:
         post_id (str): The ID of the blog post to update.
         updated_post (BlogPost): The blog post object containing updated post details.
+        meta (MetaInfoSchema): User's metadata (automatically populated from cookies).
 
     Returns:
         JSONResponse: Success response if the blog post is updated successfully, or
@@ -75,22 +119,70 @@ async def update_post(post_id: str, updated_post: BlogPost):
         Exception: Logs and raises any other general exception.
     """
     try:
-        BlogPostHandler().save_blog_post_details(updated_post, post_id)
-        return DefaultSuccessResponse(status="success", message="Blog Got Updated Successfully", data=None)
+        response = await BlogPostHandler().save_blog_post_details(updated_post, meta.user_id, post_id=post_id)
+        return success_response(message="Blog Got Updated Successfully", data=response)
+    except PydanticValidationError as validation_error:
+        return JSONResponse(
+            status_code=422,
+            content={"detail": jsonable_encoder(validation_error.errors())},
+        )
+    except Exception as e:
+        tb = traceback.format_exc()
+        logger.exception(tb)
+        return failure_response(error=e.args, message=str(e))
+
+
+# GET /api/posts/search - Full-text search over blog posts
+@blog_post_router.get(APIEndpoints.api_posts_search, dependencies=[Depends(RBAC(entity_name=entity_name, operation=["view"]))])
+async def search_posts(
+    q: str = Query(..., min_length=1, description="Words to search for in title and content"),
+    page: int = Query(1, gt=0, description="1-based page number"),
+    page_size: Optional[int] = Query(None, gt=0, description="Posts per page, capped by the server maximum"),
+    fields: Optional[str] = Query(None, description="Comma separated post fields to return, e.g. title,meta"),
+):
+    """
+    Search blog posts by title and content.
+
+    This endpoint returns non-deleted posts matching the search text, most relevant first.
+    A match in the title ranks higher than one in the content.
+
+    Args:
+        q (str): The search text.
+        page (int): The 1-based page number.
+        page_size (Optional[int]): Number of posts per page.
+        fields (Optional[str]): Comma separated post fields to return, all fields by default.
+
+    Returns:
+        JSONResponse: Success response with the page of matching posts and their score, or
+                      failure response in case of exceptions.
+
+    Raises:
+        PydanticValidationError: If input validation fails.
+        Exception: Logs and raises any other general exception.
+    """
+    try:
+        projection = BlogPostHandler.get_projection(fields)
+        response = await BlogPostHandler().search_blog_posts(q, page=page, page_size=page_size, projection=projection)
+        return success_response(message="success", data=response)
     except PydanticValidationError as validation_error:
         return JSONResponse(
             status_code=422,
             content={"detail": jsonable_encoder(validation_error.errors())},
         )
+    except InputRequestError as input_error:
+        return JSONResponse(status_code=422, content={"detail": str(input_error)})
     except Exception as e:
         tb = traceback.format_exc()
         logger.exception(tb)
-        return DefaultFailureResponse(error=e.args, message=e.args)
+        return failure_response(error=e.args, message=str(e))
 
 
 # GET /api/posts/{id} - Retrieve details of a specific blog post
 @blog_post_router.get(APIEndpoints.api_posts, dependencies=[Depends(RBAC(entity_name=entity_name, operation=["view"]))])
-async def get_post(post_id: str):
+async def get_post(
+    post_id: str,
+    fields: Optional[str] = Query(None, description="Comma separated post fields to return, e.g. title,meta"),
+):
     """
     Retrieve details of a specific blog post by its ID.
 
@@ -98,6 +190,7 @@ async def get_post(post_id: str):
 
     Args:
         post_id (str): The ID of the blog post to retrieve.
+        fields (Optional[str]): Comma separated post fields to return, all fields by default.
 
     Returns:
         JSONResponse: Success response with the blog post details, or failure response if the post is not found.
@@ -107,49 +200,129 @@ async def get_post(post_id: str):
         Exception: Logs and raises any other general exception.
     """
     try:
-        response = BlogPostHandler().fetch_blog_post_details(post_id)
-        if response:
-            return DefaultSuccessResponse(status="success", message="Post Details", data=response)
+        projection = BlogPostHandler.get_projection(fields)
+        response = await BlogPostHandler().fetch_blog_post_details(
+            post_id, projection=projection, raw=RAW_BSON_READS
+        )
+        if response is not None:
+            return success_response(message="Post Details", data=response, raw=RAW_BSON_READS)
         else:
-            return DefaultResponse(status="Failed", message="Post not found", data=response)
+            return default_response(status="Failed", message="Post not found", data=response)
     except PydanticValidationError as validation_error:
         return JSONResponse(
             status_code=422,
             content={"detail": jsonable_encoder(validation_error.errors())},
         )
+    except InputRequestError as input_error:
+        return JSONResponse(status_code=422, content={"detail": str(input_error)})
     except Exception as e:
         tb = traceback.format_exc()
         logger.exception(tb)
-        return DefaultFailureResponse(error=e.args, message=e.args)
+        return failure_response(error=e.args, message=str(e))
+
+
+# GET /api/posts/batch - Retrieve many blog posts by ID
+@blog_post_router.get(APIEndpoints.api_posts_batch, dependencies=[Depends(RBAC(entity_name=entity_name, operation=["view"]))])
+async def get_posts_by_ids(
+    post_ids: List[str] = Query(..., description="Repeat for every post, e.g. ?post_ids=post_1&post_ids=post_2"),
+    fields: Optional[str] = Query(None, description="Comma separated post fields to return, e.g. title,meta"),
+):
+    """
+    Retrieve many blog posts by their IDs in one request.
+
+    This endpoint resolves all IDs with a single query instead of one request per post.
+
+    Args:
+        post_ids (List[str]): The IDs of the blog posts to retrieve, at most DBConf.MULTI_GET_MAX_IDS.
+        fields (Optional[str]): Comma separated post fields to return, all fields by default.
+
+    Returns:
+        JSONResponse: Success response with the found posts in request order and the list of
+                      IDs that were not found, or failure response in case of exceptions.
+
+    Raises:
+        PydanticValidationError: If input validation fails for the post IDs.
+        Exception: Logs and raises any other general exception.
+    """
+    if len(post_ids) > DBConf.MULTI_GET_MAX_IDS:
+        return JSONResponse(
+            status_code=422,
+            content={"detail": f"At most {DBConf.MULTI_GET_MAX_IDS} post IDs are accepted per request"},
+        )
+    try:
+        projection = BlogPostHandler.get_projection(fields)
+        response = await BlogPostHandler().fetch_blog_posts_by_ids(post_ids, projection=projection)
+        return success_response(message="Post Details", data=response)
+    except PydanticValidationError as validation_error:
+        return JSONResponse(
+            status_code=422,
+            content={"detail": jsonable_encoder(validation_error.errors())},
+        )
+    except InputRequestError as input_error:
+        return JSONResponse(status_code=422, content={"detail": str(input_error)})
+    except Exception as e:
+        tb = traceback.format_exc()
+        logger.exception(tb)
+        return failure_response(error=e.args, message=str(e))
 
 
 # GET /api/posts - Retrieve a list of blog posts
 @blog_post_router.get(APIEndpoints.api_fetch_all_posts, dependencies=[Depends(RBAC(entity_name=entity_name, operation=["view"]))])
-async def get_posts():
+async def get_posts(
+    page_size: Optional[int] = Query(None, gt=0, description="Posts per page, capped by the server maximum"),
+    continuation_token: Optional[str] = Query(None, description="Token returned with the previous page"),
+    include_total: bool = Query(False, description="Also return the total number of posts"),
+    stream: bool = Query(False, description="Stream every post as newline-delimited JSON instead of a page"),
+    fields: Optional[str] = Query(None, description="Comma separated post fields to return, e.g. title,meta"),
+):
     """
-    Retrieve a list of all blog posts.
+    Retrieve a page of blog posts.
+
+    This endpoint fetches one page of non-deleted blog posts ordered by post ID. Pass the
+    returned continuation token to fetch the next page, it is null on the last page.
+    With `stream=true` all posts are written as newline-delimited JSON while the cursor is
+    read, for clients syncing the whole catalogue.
 
-    This endpoint fetches and returns a list of all non-deleted blog posts.
+    Args:
+        page_size (Optional[int]): Number of posts per page.
+        continuation_token (Optional[str]): Token returned with the previous page.
+        include_total (bool): Whether to include the total count of posts.
+        stream (bool): Whether to stream all posts as NDJSON.
+        fields (Optional[str]): Comma separated post fields to return, all fields by default.
 
     Returns:
-        JSONResponse: Success response with the list of blog posts, or failure response in case of exceptions.
+        JSONResponse: Success response with the page of blog posts, or failure response in case of exceptions.
+        StreamingResponse: One JSON document per line when streaming.
 
     Raises:
         PydanticValidationError: If input validation fails.
         Exception: Logs and raises any other general exception.
     """
     try:
-        response = BlogPostHandler().fetch_all_blog_posts()
-        return DefaultSuccessResponse(status="success", message="success", data=response)
+        projection = BlogPostHandler.get_projection(fields)
+        if stream:
+            return StreamingResponse(
+                BlogPostHandler().stream_all_blog_posts(projection=projection), media_type="application/x-ndjson"
+            )
+        response = await BlogPostHandler().fetch_all_blog_posts(
+            page_size=page_size,
+            continuation_token=continuation_token,
+            include_total=include_total,
+            projection=projection,
+            raw=RAW_BSON_READS,
+        )
+        return success_response(message="success", data=response, raw=RAW_BSON_READS)
     except PydanticValidationError as validation_error:
         return JSONResponse(
             status_code=422,
             content={"detail": jsonable_encoder(validation_error.errors())},
         )
+    except InputRequestError as input_error:
+        return JSONResponse(status_code=422, content={"detail": str(input_error)})
     except Exception as e:
         tb = traceback.format_exc()
         logger.exception(tb)
-        return DefaultFailureResponse(error=e.args, message=e.args)
+        return failure_response(error=e.args, message=str(e))
 
 
 # DELETE /api/posts/{id} - Delete a blog post
@@ -171,8 +344,8 @@ async def delete_post(post_id: str):
         Exception: Logs and raises any other general exception.
     """
     try:
-        BlogPostHandler().delete_blog_post(post_id)
-        return DefaultSuccessResponse(status="success", message="Post Deleted Successfully", data=None)
+        await BlogPostHandler().delete_blog_post(post_id)
+        return success_response(message="Post Deleted Successfully", data=None)
     except PydanticValidationError as validation_error:
         return JSONResponse(
             status_code=422,
@@ -181,4 +354,4 @@ async def delete_post(post_id: str):
     except Exception as e:
         tb = traceback.format_exc()
         logger.exception(tb)
-        return DefaultFailureResponse(error=e.args, message=e.args)
+        return failure_response(error=e.args, message=str(e))
@@ -0,0 +1,43 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from scripts.constants.app_constants import APIEndpoints
+from scripts.logging import logger
+from scripts.utils.metrics import registry, sample_lines
+from scripts.utils.security_utils.permission_cache import permission_cache
+from scripts.utils.security_utils.token_cache import verified_token_cache
+
+metrics_router = APIRouter(tags=["Monitoring"])
+
+caches = {"verified_token": verified_token_cache, "permission": permission_cache}
+
+
+def cache_metrics():
+    stats = {name: cache.stats() for name, cache in caches.items()}
+    ratios = {
+        name: each["hits"] / (each["hits"] + each["misses"]) if each["hits"] + each["misses"] else 0
+        for name, each in stats.items()
+    }
+    yield from sample_lines("cache_hits_total", "counter", "Cache lookups served from memory", "cache", {name: each["hits"] for name, each in stats.items()})
+    yield from sample_lines("cache_misses_total", "counter", "Cache lookups that went to Redis or were re-verified", "cache", {name: each["misses"] for name, each in stats.items()})
+    yield from sample_lines("cache_hit_ratio", "gauge", "Hits over lookups since start", "cache", ratios)
+    yield from sample_lines("cache_entries", "gauge", "Entries currently cached", "cache", {name: each["size"] for name, each in stats.items()})
+
+
+def log_queue_metrics():
+    dropped = {handler.name or type(handler).__name__: handler.dropped for handler in logger.handlers if hasattr(handler, "dropped")}
+    yield from sample_lines("log_records_dropped_total", "counter", "Log records dropped by the bounded log queue", "handler", dropped)
+
+
+registry.register_collector(cache_metrics)
+registry.register_collector(log_queue_metrics)
+
+
+# GET /metrics - Prometheus scrape endpoint
+@metrics_router.get(APIEndpoints.metrics, include_in_schema=False)
+async def metrics():
+    """
+    Expose request, Mongo and Redis latency histograms and cache statistics in the
+    Prometheus text format.
+    """
+    return PlainTextResponse(registry.expose(), media_type="text/plain; version=0.0.4; charset=utf-8")
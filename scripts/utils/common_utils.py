@@ -2,10 +2,9 @@ from datetime import datetime, timedelta, timezone
 from functools import lru_cache, wraps
 import time
 from fastapi import Request
-from scripts.db.mongo import mongo_client
 from scripts.constants.common_constants import Secrets, CommonKeys
-from scripts.db.mongo.blog_posts.collections.unique_id import UniqueId, UniqueIdSchema
 from scripts.logging import logger
+from scripts.utils.id_allocator import get_id_allocator
 from scripts.utils.security_utils.apply_encrytion_util import create_token
 from scripts.utils.security_utils.jwt_util import JWT
 
@@ -31,19 +30,13 @@ def timed_lru_cache(seconds: int = 10, maxsize: int = 128):
 
 
 class CommonUtils(CommonKeys):
-    def __init__(self):
-        self.unique_con = UniqueId(mongo_client)
+    @staticmethod
+    async def get_next_id(_param):
+        return await get_id_allocator(_param).next_id()
 
-    def get_next_id(self, _param):
-        my_dict = UniqueIdSchema(key=_param)
-        my_doc = self.unique_con.find_one_record(key=_param)
-        if not my_doc.id:
-            my_dict.id = "100"
-            return self.unique_con.insert_record(my_dict)
-        else:
-            count_value = str(int(my_doc.id) + 1)
-            my_dict.id = count_value
-            return self.unique_con.update_record(my_dict)
+    @staticmethod
+    async def get_next_ids(_param, count):
+        return await get_id_allocator(_param).next_ids(count)
 
     def get_user_meta(self, user_id=None, check_flag=False):
         data_for_meta = {}
@@ -73,7 +66,7 @@ class CommonUtils(CommonKeys):
         }
 
     @staticmethod
-    def create_token(host: str = "127.0.0.1", user_id=None, internal_token=Secrets.token):
+    async def create_token(host: str = "127.0.0.1", user_id=None, internal_token=Secrets.token):
         """
         This method is to create a cookie
         """
@@ -81,7 +74,7 @@ class CommonUtils(CommonKeys):
         try:
             if user_id is None:
                 user_id = "user_099"
-            return create_token(user_id=user_id, ip=host, token=internal_token)
+            return await create_token(user_id=user_id, ip=host, token=internal_token)
         except Exception as e:
             logger.exception(str(e))
             raise
@@ -0,0 +1,88 @@
+import asyncio
+from collections import deque
+from typing import Dict, List
+
+from scripts.config import DBConf
+from scripts.db.mongo import async_mongo_client
+from scripts.db.mongo.blog_posts.collections.unique_id import UniqueId
+from scripts.logging import logger
+
+
+class IdBlockAllocator:
+    """
+    Hands out ids for one `unique_id` key from blocks reserved with a single atomic
+    increment. Each process owns the blocks it reserved, so ids stay unique across
+    workers and replicas, but they are only increasing per process and the unused
+    tail of a block is skipped when the process exits.
+    """
+
+    def __init__(self, unique_con: UniqueId, key: str, block_size: int = 1):
+        self.unique_con = unique_con
+        self.key = key
+        self.block_size = max(int(block_size), 1)
+        self.low_watermark = self.block_size // 4
+        self._blocks = deque()
+        self._refill_task = None
+
+    @property
+    def remaining(self) -> int:
+        return sum(len(block) for block in self._blocks)
+
+    async def _reserve(self, size: int) -> range:
+        high = await self.unique_con.reserve_block(self.key, size)
+        return range(high - size + 1, high + 1)
+
+    async def _refill(self, size: int):
+        try:
+            self._blocks.append(await self._reserve(size))
+        finally:
+            self._refill_task = None
+
+    def _start_refill(self, size: int) -> asyncio.Task:
+        self._refill_task = asyncio.create_task(self._refill(size))
+        self._refill_task.add_done_callback(self._log_refill_failure)
+        return self._refill_task
+
+    def _log_refill_failure(self, task: asyncio.Task):
+        if not task.cancelled() and task.exception():
+            logger.error(f"Failed to reserve id block for {self.key}: {str(task.exception())}")
+
+    def _take(self, count: int) -> List[int]:
+        ids = []
+        while len(ids) < count:
+            block = self._blocks[0]
+            needed = count - len(ids)
+            ids.extend(block[:needed])
+            if needed >= len(block):
+                self._blocks.popleft()
+            else:
+                self._blocks[0] = block[needed:]
+        return ids
+
+    async def next_ids(self, count: int = 1) -> List[str]:
+        """
+        Returns `count` unused ids. Served from memory while the current block lasts,
+        otherwise every caller waits on the same in-flight reservation.
+        """
+        while self.remaining < count:
+            task = self._refill_task or self._start_refill(max(self.block_size, count - self.remaining))
+            await asyncio.shield(task)
+        ids = self._take(count)
+        if self.block_size > 1 and self.remaining <= self.low_watermark and self._refill_task is None:
+            self._start_refill(self.block_size)
+        return [str(each) for each in ids]
+
+    async def next_id(self) -> str:
+        ids = await self.next_ids(1)
+        return ids[0]
+
+
+_allocators: Dict[str, IdBlockAllocator] = {}
+
+
+def get_id_allocator(key: str) -> IdBlockAllocator:
+    if key not in _allocators:
+        _allocators[key] = IdBlockAllocator(
+            UniqueId(async_mongo_client), key=key, block_size=DBConf.UNIQUE_ID_BLOCK_SIZE
+        )
+    return _allocators[key]
@@ -0,0 +1,211 @@
+import asyncio
+import functools
+import threading
+from bisect import bisect_left
+from time import perf_counter
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from fastapi import HTTPException
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(label_names: Tuple[str, ...], label_values: Tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(label_names, label_values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(perf_counter() - self.start, *self.labels)
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def expose(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = list(self._values.items())
+        lines.extend(f"{self.name}{format_labels(self.label_names, labels)} {value}" for labels, value in values)
+        return lines
+
+
+class Histogram:
+    """
+    Cumulative Prometheus histogram. `observe` only bumps one bucket, the running sum and
+    the count; buckets are accumulated when the metrics are scraped.
+    """
+
+    def __init__(self, name: str, documentation: str, label_names: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = tuple(sorted(buckets))
+        # per label values: [count per bucket..., count above the last bucket, sum]
+        self._series: Dict[Tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def time(self, *labels) -> _Timer:
+        """
+        with histogram.time("label"): ... observes the duration of the block in seconds
+        """
+        return _Timer(self, labels)
+
+    def expose(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = [(labels, list(values)) for labels, values in self._series.items()]
+        for labels, values in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), values[:-1]):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{format_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(self.label_names, labels)} {values[-1]}")
+            lines.append(f"{self.name}_count{format_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = []
+        self.collectors: List[Callable[[], Iterable[str]]] = []
+
+    def counter(self, name: str, documentation: str, label_names: Tuple[str, ...] = ()) -> Counter:
+        metric = Counter(name, documentation, label_names)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, label_names: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, label_names, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], Iterable[str]]):
+        """
+        Adds a callable returning exposition lines, read on every scrape (e.g. cache stats)
+        """
+        self.collectors.append(collector)
+
+    def expose(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.expose())
+        for collector in self.collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+def sample_lines(name: str, metric_type: str, documentation: str, label_name: str, samples: Dict[str, float]) -> List[str]:
+    """
+    Exposition lines of one gauge or counter whose values come from elsewhere
+    """
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {metric_type}"]
+    lines.extend(f'{name}{{{label_name}="{escape_label(label)}"}} {value}' for label, value in samples.items())
+    return lines
+
+
+registry = MetricsRegistry()
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "Time spent in the route handler and its dependencies", ("method", "route")
+)
+http_requests_total = registry.counter("http_requests_total", "Requests handled per status code", ("method", "route", "status"))
+mongo_operation_duration = registry.histogram(
+    "mongo_operation_duration_seconds", "Duration of Mongo collection helper calls", ("collection", "operation")
+)
+redis_command_duration = registry.histogram(
+    "redis_command_duration_seconds", "Duration of Redis commands on the request path", ("db", "command")
+)
+
+
+def timed_mongo_operation(func):
+    """
+    Observes the duration of a Mongo collection helper method, labelled by collection and
+    method name. Cursor returning methods (find, aggregate) are not wrapped, their time is
+    spent in whoever iterates the cursor.
+    """
+    operation = func.__name__
+    if asyncio.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_wrapper(self, *args, **kwargs):
+            with mongo_operation_duration.time(self.collection, operation):
+                return await func(self, *args, **kwargs)
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        with mongo_operation_duration.time(self.collection, operation):
+            return func(self, *args, **kwargs)
+
+    return wrapper
+
+
+class TimedRoute(APIRoute):
+    """
+    Route class recording the latency and status of every request, labelled with the
+    route template rather than the raw path. Streaming responses are timed until the
+    response object is returned, not until the body is sent.
+    """
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        route = self.path_format
+
+        async def timed_handler(request):
+            start = perf_counter()
+            status_code = 500
+            try:
+                response = await handler(request)
+                status_code = response.status_code
+                return response
+            except HTTPException as e:
+                status_code = e.status_code
+                raise
+            except RequestValidationError:
+                status_code = 422
+                raise
+            finally:
+                http_request_duration.observe(perf_counter() - start, request.method, route)
+                http_requests_total.inc(request.method, route, status_code)
+
+        return timed_handler
@@ -1,17 +1,103 @@
+import base64
 import os
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from pymongo import MongoClient
+from bson import json_util
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCursor
+from pymongo import IndexModel, MongoClient, ReturnDocument
 from pymongo.cursor import Cursor
+from pymongo.errors import BulkWriteError
+from pymongo.results import BulkWriteResult
 
-from scripts.logging import logger
+from scripts.config import DBConf
+from scripts.errors import InputRequestError
+from scripts.logging import TraceSummary, logger
+from scripts.utils.metrics import timed_mongo_operation
+
+try:
+    import bsonjs
+except ImportError:  # python-bsonjs is optional, json_util is the slower fallback
+    bsonjs = None
+
+RAW_BSON_CODEC_OPTIONS = CodecOptions(document_class=RawBSONDocument)
+# without bsonjs the json_util fallback inflates every raw document anyway and is slower
+# than decoded reads, so raw reads are only taken when bsonjs does the conversion
+RAW_BSON_READS = bool(DBConf.RAW_BSON_READS) and bsonjs is not None
+if DBConf.RAW_BSON_READS and bsonjs is None:
+    logger.warning("RAW_BSON_READS is ignored, python-bsonjs is not installed")
+
+
+def raw_document_to_json(document: RawBSONDocument) -> bytes:
+    """
+    Converts a RawBSONDocument to relaxed extended JSON. With python-bsonjs installed the
+    BSON bytes are converted in C without building Python objects for the fields.
+    """
+    if bsonjs is not None:
+        return bsonjs.dumps(document.raw, mode=bsonjs.RELAXED).encode()
+    return json_util.dumps(document, json_options=json_util.RELAXED_JSON_OPTIONS).encode()
+
+
+def encode_continuation_token(value: Any) -> str:
+    """
+    Wraps the last sort key value of a page into an opaque, url safe token
+    """
+    return base64.urlsafe_b64encode(json_util.dumps({"after": value}).encode()).decode()
+
+
+def decode_continuation_token(token: str) -> Any:
+    try:
+        return json_util.loads(base64.urlsafe_b64decode(token.encode()))["after"]
+    except Exception:
+        raise InputRequestError("Invalid continuation token")
+
+
+def keyset_page_arguments(query: Dict, sort_key: str, page_size: Optional[int], continuation_token: Optional[str], filter_dict: Optional[Dict]):
+    """
+    Builds the query, projection and limit of one keyset page. The page size falls back
+    to DBConf.DEFAULT_PAGE_SIZE and is capped at DBConf.MAX_PAGE_SIZE, one extra document
+    is requested to know whether another page follows.
+    """
+    page_size = min(page_size or DBConf.DEFAULT_PAGE_SIZE, DBConf.MAX_PAGE_SIZE)
+    if continuation_token:
+        query = {"$and": [query, {sort_key: {"$gt": decode_continuation_token(continuation_token)}}]}
+    projection = dict(filter_dict) if filter_dict is not None else {"_id": 0}
+    if projection.get(sort_key) == 0:
+        projection.pop(sort_key)
+    elif any(value for key, value in projection.items() if key != "_id"):
+        projection[sort_key] = 1
+    return query, projection, page_size
+
+
+def keyset_page_result(documents: List, sort_key: str, page_size: int) -> Tuple[List, Optional[str]]:
+    if len(documents) <= page_size:
+        return documents, None
+    documents = documents[:page_size]
+    return documents, encode_continuation_token(documents[-1][sort_key])
+
+
+def plan_stages(plan) -> List[str]:
+    """
+    Returns every stage name of an explain plan, across classic and SBE plan layouts
+    """
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(plan_stages(value))
+    elif isinstance(plan, list):
+        for value in plan:
+            stages.extend(plan_stages(value))
+    return stages
 
 
 class MongoConnect:
-    def __init__(self, uri):
+    def __init__(self, uri, event_listeners: Optional[List] = None):
         try:
             self.uri = uri
-            self.client = MongoClient(self.uri, connect=False)
+            self.client = MongoClient(self.uri, connect=False, event_listeners=event_listeners or [])
         except Exception as e:
             logger.exception(str(e))
             raise
@@ -29,6 +115,7 @@ class MongoCollectionBaseClass:
         self.database = database
         self.collection = collection
 
+    @timed_mongo_operation
     def insert_one(self, data: Dict):
         """
         The function is used to inserting a document to a collection in a Mongo Database.
@@ -41,12 +128,13 @@ class MongoCollectionBaseClass:
             db = self.client[database_name]
             collection = db[collection_name]
             response = collection.insert_one(data)
-            logger.qtrace(data)
+            logger.qtrace("%s, %s", self.collection, TraceSummary(data))
             return response.inserted_id
         except Exception as e:
             logger.exception(str(e))
             raise
 
+    @timed_mongo_operation
     def insert_many(self, data: List):
         """
         The function is used to inserting documents to a collection in a Mongo Database.
@@ -59,7 +147,7 @@ class MongoCollectionBaseClass:
             db = self.client[database_name]
             collection = db[collection_name]
             response = collection.insert_many(data)
-            logger.qtrace(data)
+            logger.qtrace("%s, %s", self.collection, TraceSummary(data))
             return response.inserted_ids
         except Exception as e:
             logger.exception(str(e))
@@ -73,6 +161,8 @@ class MongoCollectionBaseClass:
         collation: Optional[bool] = False,
         skip: Optional[int] = 0,
         limit: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        raw: bool = False,
     ) -> Cursor:
         """
         The function is used to query documents from a given collection in a Mongo Database
@@ -82,6 +172,8 @@ class MongoCollectionBaseClass:
         :param collation: can add rules for lettercase and accent marks.
         :param skip: Skip Number
         :param limit: Limit Number
+        :param batch_size: Documents fetched per round trip while iterating
+        :param raw: Return RawBSONDocuments, fields are only decoded when accessed
         :return: List of Documents
         """
         if sort is None:
@@ -92,7 +184,7 @@ class MongoCollectionBaseClass:
         collection_name = self.collection
         try:
             db = self.client[database_name]
-            collection = db[collection_name]
+            collection = db.get_collection(collection_name, codec_options=RAW_BSON_CODEC_OPTIONS) if raw else db[collection_name]
             if len(sort) > 0:
                 cursor = (
                     collection.find(
@@ -111,12 +203,47 @@ class MongoCollectionBaseClass:
                 cursor = cursor.limit(limit)
             if collation:
                 cursor = cursor.collation({"locale": "en"})
-            logger.qtrace(f"{query}, {filter_dict}")
+            if batch_size:
+                cursor = cursor.batch_size(batch_size)
+            logger.qtrace("%s, %s, %s", self.collection, TraceSummary(query), TraceSummary(filter_dict))
             return cursor
         except Exception as e:
             logger.exception(str(e))
             raise
 
+    @timed_mongo_operation
+    def find_page(
+        self,
+        query: Dict,
+        sort_key: str = "_id",
+        page_size: Optional[int] = None,
+        continuation_token: Optional[str] = None,
+        filter_dict: Optional[Dict] = None,
+        include_total: bool = False,
+        raw: bool = False,
+    ):
+        """
+        Keyset pagination over `find`: documents are ordered by `sort_key`, which must be
+        unique and indexed, and each page resumes after the last key of the previous one,
+        so deep pages cost the same as the first.
+        :param query: Query Dictionary
+        :param sort_key: Unique, indexed field to order and resume on
+        :param page_size: Documents per page, capped at DBConf.MAX_PAGE_SIZE
+        :param continuation_token: Token returned with the previous page
+        :param filter_dict: Filter Dictionary
+        :param include_total: Also count all documents matching the query
+        :param raw: Return RawBSONDocuments, see `find`
+        :return: documents, continuation token of the next page (None on the last page), total count
+        """
+        page_query, projection, page_size = keyset_page_arguments(
+            query, sort_key, page_size, continuation_token, filter_dict
+        )
+        cursor = self.find(page_query, projection, sort=[(sort_key, 1)], limit=page_size + 1, raw=raw)
+        documents, next_token = keyset_page_result(list(cursor), sort_key, page_size)
+        total = self.count_documents(query, limit=None) if include_total else None
+        return documents, next_token, total
+
+    @timed_mongo_operation
     def count_documents(self, query: Dict, limit: Optional[int] = 1) -> Cursor:
         """
         The function is used to count documents from a given collection in a Mongo Database
@@ -129,25 +256,29 @@ class MongoCollectionBaseClass:
         try:
             db = self.client[database_name]
             collection = db[collection_name]
-            return collection.count_documents(query, limit=limit)
+            if limit:
+                return collection.count_documents(query, limit=limit)
+            return collection.count_documents(query)
         except Exception as e:
             logger.exception(str(e))
             raise
 
-    def find_one(self, query: Dict, filter_dict: Optional[Dict] = None):
+    @timed_mongo_operation
+    def find_one(self, query: Dict, filter_dict: Optional[Dict] = None, raw: bool = False):
         try:
             database_name = self.database
             collection_name = self.collection
             if filter_dict is None:
                 filter_dict = {"_id": 0}
             db = self.client[database_name]
-            collection = db[collection_name]
-            logger.qtrace(f"{self.collection}, {query}, {filter_dict}")
+            collection = db.get_collection(collection_name, codec_options=RAW_BSON_CODEC_OPTIONS) if raw else db[collection_name]
+            logger.qtrace("%s, %s, %s", self.collection, TraceSummary(query), TraceSummary(filter_dict))
             return collection.find_one(query, filter_dict)
         except Exception as e:
             logger.exception(str(e))
             raise
 
+    @timed_mongo_operation
     def update_one(self, query: Dict, data: Dict, upsert: bool = False):
         """
 
@@ -162,12 +293,68 @@ class MongoCollectionBaseClass:
             db = self.client[database_name]
             collection = db[collection_name]
             response = collection.update_one(query, {"$set": data}, upsert=upsert)
-            logger.qtrace(f"{self.collection}, {query}, {data}")
+            logger.qtrace("%s, %s, %s", self.collection, TraceSummary(query), TraceSummary(data))
             return response.modified_count
         except Exception as e:
             logger.exception(str(e))
             raise
 
+    @timed_mongo_operation
+    def find_one_and_update(
+        self, query: Dict, update, upsert: bool = False, filter_dict: Optional[Dict] = None, return_new: bool = True
+    ):
+        """
+        Atomically updates one document and returns it in a single round trip.
+        :param query: Query Dictionary
+        :param update: Update document (operators) or aggregation pipeline
+        :param upsert: Insert the document if it does not exist
+        :param filter_dict: Projection for the returned document
+        :param return_new: Return the document after the update instead of before
+        :return: The matched document
+        """
+        try:
+            database_name = self.database
+            collection_name = self.collection
+            if filter_dict is None:
+                filter_dict = {"_id": 0}
+            db = self.client[database_name]
+            collection = db[collection_name]
+            logger.qtrace("%s, %s, %s", self.collection, TraceSummary(query), TraceSummary(update))
+            return collection.find_one_and_update(
+                query,
+                update,
+                projection=filter_dict,
+                upsert=upsert,
+                return_document=ReturnDocument.AFTER if return_new else ReturnDocument.BEFORE,
+            )
+        except Exception as e:
+            logger.exception(str(e))
+            raise
+
+    @timed_mongo_operation
+    def bulk_write(self, operations: List, ordered: bool = False) -> BulkWriteResult:
+        """
+        Sends a batch of write operations in as few round trips as the driver allows.
+        With ordered=False the server keeps going after a failed operation and a
+        BulkWriteError carries the per operation errors.
+        :param operations: List of InsertOne/UpdateOne/DeleteOne/... requests
+        :param ordered: Stop at the first error and apply in order
+        :return: Bulk write result
+        """
+        try:
+            database_name = self.database
+            collection_name = self.collection
+            db = self.client[database_name]
+            collection = db[collection_name]
+            logger.qtrace("%s, %s", self.collection, TraceSummary(operations))
+            return collection.bulk_write(operations, ordered=ordered)
+        except BulkWriteError:
+            raise
+        except Exception as e:
+            logger.exception(str(e))
+            raise
+
+    @timed_mongo_operation
     def update_to_set(self, query: Dict, param: str, data: Dict, upsert: bool = False):
         """
 
@@ -183,12 +370,13 @@ class MongoCollectionBaseClass:
             db = self.client[database_name]
             collection = db[collection_name]
             response = collection.update_one(query, {"$addToSet": {param: data}}, upsert=upsert)
-            logger.qtrace(f"{self.collection}, {query}, {data}")
+            logger.qtrace("%s, %s, %s", self.collection, TraceSummary(query), TraceSummary(data))
             return response.modified_count
         except Exception as e:
             logger.exception(str(e))
             raise
 
+    @timed_mongo_operation
     def update_many(self, query: Dict, data: Dict, upsert: bool = False):
         """
 
@@ -203,12 +391,13 @@ class MongoCollectionBaseClass:
             db = self.client[database_name]
             collection = db[collection_name]
             response = collection.update_many(query, {"$set": data}, upsert=upsert)
-            logger.qtrace(f"{query}, {data}")
+            logger.qtrace("%s, %s, %s", self.collection, TraceSummary(query), TraceSummary(data))
             return response.modified_count
         except Exception as e:
             logger.exception(str(e))
             raise
 
+    @timed_mongo_operation
     def delete_many(self, query: Dict):
         """
         :param query:
@@ -220,12 +409,13 @@ class MongoCollectionBaseClass:
             db = self.client[database_name]
             collection = db[collection_name]
             response = collection.delete_many(query)
-            logger.qtrace(query)
+            logger.qtrace("%s, %s", self.collection, TraceSummary(query))
             return response.deleted_count
         except Exception as e:
             logger.exception(str(e))
             raise
 
+    @timed_mongo_operation
     def delete_one(self, query: Dict):
         """
         :param query:
@@ -237,12 +427,13 @@ class MongoCollectionBaseClass:
             db = self.client[database_name]
             collection = db[collection_name]
             response = collection.delete_one(query)
-            logger.qtrace(query)
+            logger.qtrace("%s, %s", self.collection, TraceSummary(query))
             return response.deleted_count
         except Exception as e:
             logger.exception(str(e))
             raise
 
+    @timed_mongo_operation
     def distinct(self, query_key: str, filter_json: Optional[Dict] = None):
         """
         :param query_key:
@@ -254,7 +445,7 @@ class MongoCollectionBaseClass:
             collection_name = self.collection
             db = self.client[database_name]
             collection = db[collection_name]
-            logger.qtrace(f"{query_key}, {filter_json}")
+            logger.qtrace("%s, %s, %s", self.collection, TraceSummary(query_key), TraceSummary(filter_json))
             return collection.distinct(query_key, filter_json)
         except Exception as e:
             logger.exception(str(e))
@@ -266,7 +457,421 @@ class MongoCollectionBaseClass:
             collection_name = self.collection
             db = self.client[database_name]
             collection = db[collection_name]
-            logger.qtrace(f"{self.collection}, {pipelines}")
+            logger.qtrace("%s, %s", self.collection, TraceSummary(pipelines))
+            if collation:
+                return collection.aggregate(pipelines, collation=collation)
+            return collection.aggregate(pipelines)
+        except Exception as e:
+            logger.exception(str(e))
+            raise
+
+
+class AsyncMongoConnect:
+    def __init__(self, uri, event_listeners: Optional[List] = None):
+        try:
+            self.uri = uri
+            self.client = AsyncIOMotorClient(self.uri, connect=False, event_listeners=event_listeners or [])
+        except Exception as e:
+            logger.exception(str(e))
+            raise
+
+    def __call__(self, *args, **kwargs):
+        return self.client
+
+    def __repr__(self):
+        return f"Async Mongo Client(uri:{self.uri})"
+
+
+class AsyncMongoCollectionBaseClass:
+    """
+    Awaitable twin of MongoCollectionBaseClass backed by Motor, so that the
+    request handlers do not block the event loop on Mongo round trips.
+
+    Subclasses declare the `indexes` they need and the `query_shapes` they issue
+    ({"filter": ..., "sort": ...}), see scripts.db.mongo.indexes.
+    """
+
+    indexes: List[IndexModel] = []
+    query_shapes: List[Dict] = []
+
+    def __init__(self, mongo_client, database, collection):
+        self.client = mongo_client
+        self.database = database
+        self.collection = collection
+
+    @timed_mongo_operation
+    async def create_indexes(self) -> List[str]:
+        """
+        Creates the declared indexes, a no-op for the ones that already exist
+        :return: Index names
+        """
+        if not self.indexes:
+            return []
+        try:
+            collection = self.client[self.database][self.collection]
+            return await collection.create_indexes(self.indexes)
+        except Exception as e:
+            logger.exception(str(e))
+            raise
+
+    @timed_mongo_operation
+    async def explain(self, query: Dict, sort=None) -> Dict:
+        """
+        Returns the query planner output of a find with the given filter and sort
+        :param query: Query Dictionary
+        :param sort: List of tuple with key and direction. [(key, -1), ...]
+        :return: Explain document
+        """
+        try:
+            return await self.find(query=query, sort=sort).explain()
+        except Exception as e:
+            logger.exception(str(e))
+            raise
+
+    @timed_mongo_operation
+    async def insert_one(self, data: Dict):
+        """
+        The function is used to inserting a document to a collection in a Mongo Database.
+        :param data: Data to be inserted
+        :return: Insert ID
+        """
+        try:
+            database_name = self.database
+            collection_name = self.collection
+            db = self.client[database_name]
+            collection = db[collection_name]
+            response = await collection.insert_one(data)
+            logger.qtrace("%s, %s", self.collection, TraceSummary(data))
+            return response.inserted_id
+        except Exception as e:
+            logger.exception(str(e))
+            raise
+
+    @timed_mongo_operation
+    async def insert_many(self, data: List):
+        """
+        The function is used to inserting documents to a collection in a Mongo Database.
+        :param data: List of Data to be inserted
+        :return: Insert IDs
+        """
+        try:
+            database_name = self.database
+            collection_name = self.collection
+            db = self.client[database_name]
+            collection = db[collection_name]
+            response = await collection.insert_many(data)
+            logger.qtrace("%s, %s", self.collection, TraceSummary(data))
+            return response.inserted_ids
+        except Exception as e:
+            logger.exception(str(e))
+            raise
+
+    def find(
+        self,
+        query: Dict,
+        filter_dict: Optional[Dict] = None,
+        sort=None,
+        collation: Optional[bool] = False,
+        skip: Optional[int] = 0,
+        limit: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        raw: bool = False,
+    ) -> AsyncIOMotorCursor:
+        """
+        The function is used to query documents from a given collection in a Mongo Database.
+        The cursor is lazy, iterate it with `async for` or `await cursor.to_list(None)`
+        :param query: Query Dictionary
+        :param filter_dict: Filter Dictionary
+        :param sort: List of tuple with key and direction. [(key, -1), ...]
+        :param collation: can add rules for lettercase and accent marks.
+        :param skip: Skip Number
+        :param limit: Limit Number
+        :param batch_size: Documents fetched per round trip while iterating
+        :param raw: Return RawBSONDocuments, fields are only decoded when accessed
+        :return: Cursor of Documents
+        """
+        if sort is None:
+            sort = []
+        if filter_dict is None:
+            filter_dict = {"_id": 0}
+        database_name = self.database
+        collection_name = self.collection
+        try:
+            db = self.client[database_name]
+            collection = db.get_collection(collection_name, codec_options=RAW_BSON_CODEC_OPTIONS) if raw else db[collection_name]
+            if len(sort) > 0:
+                cursor = (
+                    collection.find(
+                        query,
+                        filter_dict,
+                    )
+                    .sort(sort)
+                    .skip(skip)
+                )
+            else:
+                cursor = collection.find(
+                    query,
+                    filter_dict,
+                ).skip(skip)
+            if limit:
+                cursor = cursor.limit(limit)
+            if collation:
+                cursor = cursor.collation({"locale": "en"})
+            if batch_size:
+                cursor = cursor.batch_size(batch_size)
+            logger.qtrace("%s, %s, %s", self.collection, TraceSummary(query), TraceSummary(filter_dict))
+            return cursor
+        except Exception as e:
+            logger.exception(str(e))
+            raise
+
+    @timed_mongo_operation
+    async def find_page(
+        self,
+        query: Dict,
+        sort_key: str = "_id",
+        page_size: Optional[int] = None,
+        continuation_token: Optional[str] = None,
+        filter_dict: Optional[Dict] = None,
+        include_total: bool = False,
+        raw: bool = False,
+    ):
+        """
+        Keyset pagination over `find`: documents are ordered by `sort_key`, which must be
+        unique and indexed, and each page resumes after the last key of the previous one,
+        so deep pages cost the same as the first.
+        :param query: Query Dictionary
+        :param sort_key: Unique, indexed field to order and resume on
+        :param page_size: Documents per page, capped at DBConf.MAX_PAGE_SIZE
+        :param continuation_token: Token returned with the previous page
+        :param filter_dict: Filter Dictionary
+        :param include_total: Also count all documents matching the query
+        :param raw: Return RawBSONDocuments, see `find`
+        :return: documents, continuation token of the next page (None on the last page), total count
+        """
+        page_query, projection, page_size = keyset_page_arguments(
+            query, sort_key, page_size, continuation_token, filter_dict
+        )
+        cursor = self.find(page_query, projection, sort=[(sort_key, 1)], limit=page_size + 1, raw=raw)
+        documents, next_token = keyset_page_result(await cursor.to_list(length=None), sort_key, page_size)
+        total = await self.count_documents(query, limit=None) if include_total else None
+        return documents, next_token, total
+
+    @timed_mongo_operation
+    async def count_documents(self, query: Dict, limit: Optional[int] = 1) -> int:
+        """
+        The function is used to count documents from a given collection in a Mongo Database
+        :param query: Query Dictionary
+        :param limit: Limit Number
+        :return: Count of Documents
+        """
+        database_name = self.database
+        collection_name = self.collection
+        try:
+            db = self.client[database_name]
+            collection = db[collection_name]
+            if limit:
+                return await collection.count_documents(query, limit=limit)
+            return await collection.count_documents(query)
+        except Exception as e:
+            logger.exception(str(e))
+            raise
+
+    @timed_mongo_operation
+    async def find_one(self, query: Dict, filter_dict: Optional[Dict] = None, raw: bool = False):
+        try:
+            database_name = self.database
+            collection_name = self.collection
+            if filter_dict is None:
+                filter_dict = {"_id": 0}
+            db = self.client[database_name]
+            collection = db.get_collection(collection_name, codec_options=RAW_BSON_CODEC_OPTIONS) if raw else db[collection_name]
+            logger.qtrace("%s, %s, %s", self.collection, TraceSummary(query), TraceSummary(filter_dict))
+            return await collection.find_one(query, filter_dict)
+        except Exception as e:
+            logger.exception(str(e))
+            raise
+
+    @timed_mongo_operation
+    async def update_one(self, query: Dict, data: Dict, upsert: bool = False):
+        """
+
+        :param upsert:
+        :param query:
+        :param data:
+        :return:
+        """
+        try:
+            database_name = self.database
+            collection_name = self.collection
+            db = self.client[database_name]
+            collection = db[collection_name]
+            response = await collection.update_one(query, {"$set": data}, upsert=upsert)
+            logger.qtrace("%s, %s, %s", self.collection, TraceSummary(query), TraceSummary(data))
+            return response.modified_count
+        except Exception as e:
+            logger.exception(str(e))
+            raise
+
+    @timed_mongo_operation
+    async def find_one_and_update(
+        self, query: Dict, update, upsert: bool = False, filter_dict: Optional[Dict] = None, return_new: bool = True
+    ):
+        """
+        Atomically updates one document and returns it in a single round trip.
+        :param query: Query Dictionary
+        :param update: Update document (operators) or aggregation pipeline
+        :param upsert: Insert the document if it does not exist
+        :param filter_dict: Projection for the returned document
+        :param return_new: Return the document after the update instead of before
+        :return: The matched document
+        """
+        try:
+            database_name = self.database
+            collection_name = self.collection
+            if filter_dict is None:
+                filter_dict = {"_id": 0}
+            db = self.client[database_name]
+            collection = db[collection_name]
+            logger.qtrace("%s, %s, %s", self.collection, TraceSummary(query), TraceSummary(update))
+            return await collection.find_one_and_update(
+                query,
+                update,
+                projection=filter_dict,
+                upsert=upsert,
+                return_document=ReturnDocument.AFTER if return_new else ReturnDocument.BEFORE,
+            )
+        except Exception as e:
+            logger.exception(str(e))
+            raise
+
+    @timed_mongo_operation
+    async def bulk_write(self, operations: List, ordered: bool = False) -> BulkWriteResult:
+        """
+        Sends a batch of write operations in as few round trips as the driver allows.
+        With ordered=False the server keeps going after a failed operation and a
+        BulkWriteError carries the per operation errors.
+        :param operations: List of InsertOne/UpdateOne/DeleteOne/... requests
+        :param ordered: Stop at the first error and apply in order
+        :return: Bulk write result
+        """
+        try:
+            database_name = self.database
+            collection_name = self.collection
+            db = self.client[database_name]
+            collection = db[collection_name]
+            logger.qtrace("%s, %s", self.collection, TraceSummary(operations))
+            return await collection.bulk_write(operations, ordered=ordered)
+        except BulkWriteError:
+            raise
+        except Exception as e:
+            logger.exception(str(e))
+            raise
+
+    @timed_mongo_operation
+    async def update_to_set(self, query: Dict, param: str, data: Dict, upsert: bool = False):
+        """
+
+        :param upsert:
+        :param query:
+        :param param:
+        :param data:
+        :return:
+        """
+        try:
+            database_name = self.database
+            collection_name = self.collection
+            db = self.client[database_name]
+            collection = db[collection_name]
+            response = await collection.update_one(query, {"$addToSet": {param: data}}, upsert=upsert)
+            logger.qtrace("%s, %s, %s", self.collection, TraceSummary(query), TraceSummary(data))
+            return response.modified_count
+        except Exception as e:
+            logger.exception(str(e))
+            raise
+
+    @timed_mongo_operation
+    async def update_many(self, query: Dict, data: Dict, upsert: bool = False):
+        """
+
+        :param upsert:
+        :param query:
+        :param data:
+        :return:
+        """
+        try:
+            database_name = self.database
+            collection_name = self.collection
+            db = self.client[database_name]
+            collection = db[collection_name]
+            response = await collection.update_many(query, {"$set": data}, upsert=upsert)
+            logger.qtrace("%s, %s, %s", self.collection, TraceSummary(query), TraceSummary(data))
+            return response.modified_count
+        except Exception as e:
+            logger.exception(str(e))
+            raise
+
+    @timed_mongo_operation
+    async def delete_many(self, query: Dict):
+        """
+        :param query:
+        :return:
+        """
+        try:
+            database_name = self.database
+            collection_name = self.collection
+            db = self.client[database_name]
+            collection = db[collection_name]
+            response = await collection.delete_many(query)
+            logger.qtrace("%s, %s", self.collection, TraceSummary(query))
+            return response.deleted_count
+        except Exception as e:
+            logger.exception(str(e))
+            raise
+
+    @timed_mongo_operation
+    async def delete_one(self, query: Dict):
+        """
+        :param query:
+        :return:
+        """
+        try:
+            database_name = self.database
+            collection_name = self.collection
+            db = self.client[database_name]
+            collection = db[collection_name]
+            response = await collection.delete_one(query)
+            logger.qtrace("%s, %s", self.collection, TraceSummary(query))
+            return response.deleted_count
+        except Exception as e:
+            logger.exception(str(e))
+            raise
+
+    @timed_mongo_operation
+    async def distinct(self, query_key: str, filter_json: Optional[Dict] = None):
+        """
+        :param query_key:
+        :param filter_json:
+        :return:
+        """
+        try:
+            database_name = self.database
+            collection_name = self.collection
+            db = self.client[database_name]
+            collection = db[collection_name]
+            logger.qtrace("%s, %s, %s", self.collection, TraceSummary(query_key), TraceSummary(filter_json))
+            return await collection.distinct(query_key, filter_json)
+        except Exception as e:
+            logger.exception(str(e))
+            raise
+
+    def aggregate(self, pipelines: List, collation=None):
+        try:
+            database_name = self.database
+            collection_name = self.collection
+            db = self.client[database_name]
+            collection = db[collection_name]
+            logger.qtrace("%s, %s", self.collection, TraceSummary(pipelines))
             if collation:
                 return collection.aggregate(pipelines, collation=collation)
             return collection.aggregate(pipelines)
@@ -0,0 +1,182 @@
+import threading
+import time
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import orjson
+from pymongo import monitoring
+
+from scripts.logging import logger
+from scripts.utils.mongo_util import plan_stages
+
+# command name -> (field holding the filter, whether the command can be explained)
+MONITORED_COMMANDS = {
+    "find": ("filter", True),
+    "aggregate": ("pipeline", True),
+    "count": ("query", True),
+    "distinct": ("query", True),
+    "findAndModify": ("query", False),
+    "update": ("updates", False),
+    "delete": ("deletes", False),
+    "insert": (None, False),
+}
+# session/transport fields the driver adds, not accepted inside an explain
+DRIVER_FIELDS = {"lsid", "txnNumber", "autocommit", "startTransaction", "readConcern", "writeConcern"}
+
+
+def query_shape(value):
+    """
+    Replaces every value of a filter or pipeline with "?" while keeping field names and
+    operators, so queries differing only in their values share one shape
+    """
+    if isinstance(value, Mapping):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if any(isinstance(item, Mapping) for item in value):
+            return [query_shape(item) for item in value]
+        return "?"
+    return "?"
+
+
+def command_shape(command_name: str, command: Mapping) -> dict:
+    field, _ = MONITORED_COMMANDS[command_name]
+    if field in ("updates", "deletes"):
+        statements = command.get(field) or [{}]
+        return {"q": query_shape(statements[0].get("q", {}))}
+    shape = {field: query_shape(command.get(field, {}))} if field else {}
+    if "sort" in command:
+        shape["sort"] = dict(command["sort"])
+    return shape
+
+
+class SlowQueryMonitor(monitoring.CommandListener):
+    """
+    Command listener aggregating duration statistics per collection, operation and
+    normalized query shape. Commands slower than `threshold_ms` are logged together with
+    the summary of their query plan, explained with `explain_client` on a background
+    thread at most once per `explain_interval` seconds per shape. getMore batches of a
+    cursor are not attributed to the originating query.
+    """
+
+    def __init__(self, threshold_ms: float = 100, explain_client=None, explain_interval: float = 60, max_shapes: int = 1000):
+        self.threshold_ms = threshold_ms
+        self.explain_client = explain_client
+        self.explain_interval = explain_interval
+        self.max_shapes = max_shapes
+        self.untracked = 0
+        self._started: Dict[tuple, tuple] = {}
+        self._shapes: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._explain_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        if event.command_name not in MONITORED_COMMANDS:
+            return
+        command = event.command
+        collection = command.get(event.command_name)
+        shape = command_shape(event.command_name, command)
+        key = f"{event.database_name}.{collection} {event.command_name} {orjson.dumps(shape, default=str).decode()}"
+        explainable = MONITORED_COMMANDS[event.command_name][1]
+        self._started[(event.connection_id, event.request_id)] = (
+            key,
+            event.database_name,
+            collection,
+            event.command_name,
+            shape,
+            {k: v for k, v in command.items() if k not in DRIVER_FIELDS and not k.startswith("$")} if explainable else None,
+        )
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        started = self._started.pop((event.connection_id, event.request_id), None)
+        if started is not None:
+            self.record(started, event.duration_micros / 1000)
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        started = self._started.pop((event.connection_id, event.request_id), None)
+        if started is not None:
+            self.record(started, event.duration_micros / 1000, failed=True)
+
+    def record(self, started: tuple, duration_ms: float, failed: bool = False):
+        key, database, collection, operation, shape, explain_command = started
+        slow = duration_ms >= self.threshold_ms
+        explain_now = False
+        with self._lock:
+            stats = self._shapes.get(key)
+            if stats is None:
+                if len(self._shapes) >= self.max_shapes:
+                    self.untracked += 1
+                    return
+                stats = self._shapes[key] = {
+                    "collection": f"{database}.{collection}",
+                    "operation": operation,
+                    "shape": shape,
+                    "count": 0,
+                    "failed": 0,
+                    "slow": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "explain": None,
+                    "_explained_at": 0.0,
+                }
+            stats["count"] += 1
+            stats["failed"] += failed
+            stats["total_ms"] += duration_ms
+            stats["max_ms"] = max(stats["max_ms"], duration_ms)
+            if slow:
+                stats["slow"] += 1
+                now = time.monotonic()
+                if explain_command and self.explain_client and now - stats["_explained_at"] >= self.explain_interval:
+                    stats["_explained_at"] = now
+                    explain_now = True
+        if not slow:
+            return
+        if explain_now:
+            self._explain_executor.submit(self.explain, key, database, explain_command, duration_ms)
+        else:
+            logger.warning(f"Slow query {duration_ms:.1f} ms: {key}")
+
+    def explain(self, key: str, database: str, command: dict, duration_ms: float):
+        try:
+            explained = self.explain_client[database].command("explain", command, verbosity="queryPlanner")
+            winning_plan = explained.get("queryPlanner", {}).get("winningPlan", {})
+            summary = {"stages": plan_stages(winning_plan), "indexes": sorted(set(index_names(winning_plan)))}
+        except Exception as e:
+            summary = {"error": str(e)}
+        with self._lock:
+            if key in self._shapes:
+                self._shapes[key]["explain"] = summary
+        logger.warning(f"Slow query {duration_ms:.1f} ms: {key}, plan: {summary}")
+
+    def top(self, top_n: int = 10, sort_by: str = "avg_ms") -> List[dict]:
+        """
+        Returns the statistics of the `top_n` slowest shapes by avg_ms, max_ms or total_ms
+        """
+        with self._lock:
+            shapes = [
+                {
+                    **{key: value for key, value in stats.items() if not key.startswith("_")},
+                    "avg_ms": stats["total_ms"] / stats["count"],
+                }
+                for stats in self._shapes.values()
+            ]
+        return sorted(shapes, key=lambda stats: stats[sort_by], reverse=True)[:top_n]
+
+    def reset(self):
+        with self._lock:
+            self._shapes.clear()
+            self.untracked = 0
+
+
+def index_names(plan) -> List[str]:
+    names = []
+    if isinstance(plan, dict):
+        if "indexName" in plan:
+            names.append(plan["indexName"])
+        for value in plan.values():
+            names.extend(index_names(value))
+    elif isinstance(plan, list):
+        for value in plan:
+            names.extend(index_names(value))
+    return names
+
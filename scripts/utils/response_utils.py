@@ -0,0 +1,65 @@
+from typing import Any, Optional
+
+import orjson
+from bson.raw_bson import RawBSONDocument
+from fastapi.responses import JSONResponse
+
+from scripts.utils.mongo_util import raw_document_to_json
+
+
+class ORJSONEnvelopeResponse(JSONResponse):
+    """
+    JSON response rendered straight from dicts/lists with orjson. Mongo documents are
+    trusted output, so they skip model validation and `jsonable_encoder`; values orjson
+    cannot encode natively (ObjectId, Decimal128, ...) fall back to `str`.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+
+def encode_raw_json(value: Any) -> bytes:
+    """
+    Encodes dicts and lists holding RawBSONDocuments, whose BSON is converted to JSON
+    directly and spliced into the output instead of being decoded to Python first
+    """
+    if isinstance(value, RawBSONDocument):
+        return raw_document_to_json(value)
+    if isinstance(value, dict):
+        return b"{" + b",".join(orjson.dumps(str(key)) + b":" + encode_raw_json(item) for key, item in value.items()) + b"}"
+    if isinstance(value, (list, tuple)):
+        return b"[" + b",".join(encode_raw_json(item) for item in value) + b"]"
+    return orjson.dumps(value, default=str)
+
+
+class RawBSONEnvelopeResponse(ORJSONEnvelopeResponse):
+    """
+    Envelope response for data read with `raw=True` from the Mongo base classes
+    """
+
+    def render(self, content: Any) -> bytes:
+        return encode_raw_json(content)
+
+
+def default_response(
+    status: str = "failed", message: Optional[str] = None, data: Any = None, status_code: int = 200, raw: bool = False
+):
+    """
+    Same envelope as DefaultResponse, pass raw=True when data holds RawBSONDocuments
+    """
+    response_class = RawBSONEnvelopeResponse if raw else ORJSONEnvelopeResponse
+    return response_class({"status": status, "message": message, "data": data}, status_code=status_code)
+
+
+def success_response(message: Optional[str] = "", data: Any = None, status: str = "success", raw: bool = False):
+    """
+    Same envelope as DefaultSuccessResponse
+    """
+    return default_response(status=status, message=message, data=data, raw=raw)
+
+
+def failure_response(error: Any = None, message: Optional[str] = None, data: Any = None, status: str = "failed"):
+    """
+    Same envelope as DefaultFailureResponse
+    """
+    return ORJSONEnvelopeResponse({"status": status, "message": message, "data": data, "error": error})
@@ -1,14 +1,26 @@
+import time
 import uuid
 from datetime import datetime, timedelta
 
+from scripts.config import Service
 from scripts.constants.common_constants import Secrets
-from scripts.db.redis_connection import login_db
+from scripts.db.redis_connection import async_login_db
+from scripts.utils.metrics import redis_command_duration
 from scripts.utils.security_utils.jwt_util import JWT
 
 jwt = JWT()
 
 
-def create_token(user_id, ip, token, age=Secrets.LOCK_OUT_TIME_MINS, login_token=None):
+def session_lifetime(age=Secrets.LOCK_OUT_TIME_MINS) -> timedelta:
+    """
+    Lifetime of the signed session token. The Redis TTL enforces the `age` idle timeout,
+    the token itself lives `1 / SESSION_REFRESH_FRACTION` times longer so it only needs
+    re-signing once its remaining lifetime drops below that fraction.
+    """
+    return timedelta(minutes=age / Service.SESSION_REFRESH_FRACTION)
+
+
+async def create_token(user_id, ip, token, age=Secrets.LOCK_OUT_TIME_MINS, login_token=None):
     """
     This method is to create a cookie
     """
@@ -18,16 +30,31 @@ def create_token(user_id, ip, token, age=Secrets.LOCK_OUT_TIME_MINS, login_token
             uid = str(uuid.uuid4()).replace("-", "")
 
         payload = {"ip": ip, "user_id": user_id, "token": token, "uid": uid, "age": age}
-        exp = datetime.utcnow() + timedelta(minutes=age)
+        exp = datetime.utcnow() + session_lifetime(age)
         _extras = {"iss": Secrets.issuer, "exp": exp}
         _payload = {**payload, **_extras}
 
         new_token = jwt.encode(_payload)
 
-        # Add session to redis
-        login_db.set(uid, new_token)
-        login_db.expire(uid, timedelta(minutes=age))
+        # Add session to redis, value and TTL in a single SET ... EX
+        with redis_command_duration.time("login", "SET"):
+            await async_login_db.set(uid, new_token, ex=timedelta(minutes=age))
 
         return uid
     except Exception:
         raise
+
+
+async def refresh_session(decoded_token, user_id, ip, token, age=Secrets.LOCK_OUT_TIME_MINS, login_token=None):
+    """
+    Slides the session window for an authenticated request. The token is only re-signed
+    when less than `age` minutes of its lifetime remain, otherwise just the TTL is bumped.
+    """
+    try:
+        if decoded_token.get("exp", 0) - time.time() < age * 60:
+            return await create_token(user_id=user_id, ip=ip, token=token, age=age, login_token=login_token)
+        with redis_command_duration.time("login", "EXPIRE"):
+            await async_login_db.expire(login_token, timedelta(minutes=age))
+        return login_token
+    except Exception:
+        raise
@@ -0,0 +1,43 @@
+from typing import Optional
+
+from fastapi import Request
+
+
+class AuthContext:
+    """
+    Identity of the current request, parsed from cookies/headers once and kept on
+    `request.state` so RBAC, MetaInfoCookie and CookieAuthentication share one copy.
+    `session` holds the verified JWT claims once CookieAuthentication has run and
+    `permissions` the user's compiled permission masks once RBAC has fetched them.
+    """
+
+    __slots__ = ("user_id", "language", "ip_address", "login_token", "session", "permissions", "meta")
+
+    def __init__(self, user_id=None, language=None, ip_address=None, login_token=None):
+        self.user_id: Optional[str] = user_id
+        self.language: Optional[str] = language
+        self.ip_address: Optional[str] = ip_address
+        self.login_token: Optional[str] = login_token
+        self.session: Optional[dict] = None
+        self.permissions: Optional[dict] = None
+        self.meta = None
+
+    @classmethod
+    def from_request(cls, request: Request) -> "AuthContext":
+        cookies = request.cookies
+        headers = request.headers
+        return cls(
+            user_id=cookies.get(
+                "user_id", cookies.get("userId", headers.get("userId", headers.get("user_id")))
+            ),
+            language=cookies.get("language", headers.get("language")),
+            ip_address=request.client.host if request.client else None,
+            login_token=cookies.get("login-token", headers.get("login-token")),
+        )
+
+
+def get_auth_context(request: Request) -> AuthContext:
+    context = getattr(request.state, "auth_context", None)
+    if context is None:
+        context = request.state.auth_context = AuthContext.from_request(request)
+    return context
@@ -8,11 +8,14 @@ from fastapi.security.api_key import APIKeyBase
 from pydantic import BaseModel, Field
 
 from scripts.config import Service
-from scripts.db.redis_connection import login_db
+from scripts.db.redis_connection import async_login_db
 
 from scripts.constants.common_constants import Secrets
-from scripts.utils.security_utils.apply_encrytion_util import create_token
+from scripts.utils.metrics import redis_command_duration
+from scripts.utils.security_utils.apply_encrytion_util import refresh_session
+from scripts.utils.security_utils.auth_context import get_auth_context
 from scripts.utils.security_utils.jwt_util import JWT
+from scripts.utils.security_utils.token_cache import verified_token_cache
 
 
 class CookieAuthentication(APIKeyBase):
@@ -34,27 +37,32 @@ class CookieAuthentication(APIKeyBase):
         self.scheme_name = self.__class__.__name__
         self.cookie_name = cookie_name
         self.scheme = APIKeyCookie(name=self.cookie_name, auto_error=False)
-        self.login_redis = login_db
+        self.login_redis = async_login_db
         self.jwt = JWT()
+        self.token_cache = verified_token_cache
 
     async def __call__(self, request: Request, response: Response) -> str:
-        cookies = request.cookies
-        login_token = cookies.get("login-token")
-        if not login_token:
-            login_token = request.headers.get("login-token")
+        context = get_auth_context(request)
+        login_token = context.login_token
         if not login_token:
             raise HTTPException(status_code=401)
 
-        jwt_token = self.login_redis.get(login_token)
+        with redis_command_duration.time("login", "GET"):
+            jwt_token = await self.login_redis.get(login_token)
         if not jwt_token:
             raise HTTPException(status_code=401)
 
-        try:
-            decoded_token = self.jwt.validate(token=jwt_token)
-            if not decoded_token:
-                raise HTTPException(status_code=401)
-        except Exception as e:
-            raise HTTPException(status_code=401, detail=e.args)
+        # notice key rotations even while every token is served from the cache
+        self.jwt.keys.refresh()
+        decoded_token = self.token_cache.get(jwt_token)
+        if decoded_token is None:
+            try:
+                decoded_token = self.jwt.validate(token=jwt_token)
+                if not decoded_token:
+                    raise HTTPException(status_code=401)
+            except Exception as e:
+                raise HTTPException(status_code=401, detail=e.args)
+            self.token_cache.put(jwt_token, decoded_token)
 
         user_id = decoded_token.get("user_id", decoded_token.get("userId"))
         _token = decoded_token.get("token")
@@ -70,9 +78,12 @@ class CookieAuthentication(APIKeyBase):
         request.cookies.update(
             {"user_id": user_id, "userId": user_id}
         )
+        context.user_id = user_id
+        context.session = decoded_token
 
         try:
-            new_token = create_token(
+            new_token = await refresh_session(
+                decoded_token,
                 user_id=user_id,
                 ip=request.client.host,
                 token=Secrets.token,
@@ -125,18 +136,12 @@ class MetaInfoCookie(APIKeyBase):
         self.scheme_name = self.__class__.__name__
 
     def __call__(self, request: Request, response: Response):
-        cookies = request.cookies
-        cookie_json = {
-            "userId": cookies.get(
-                "user_id", cookies.get("userId", request.headers.get("userId", request.headers.get("user_id")))
-            ),
-            "language": cookies.get("language", request.headers.get("language")),
-        }
+        context = get_auth_context(request)
         return MetaInfoSchema(
-            user_id=cookie_json["userId"],
-            language=cookie_json["language"],
-            ip_address=request.client.host,
-            login_token=cookies.get("login-token"),
+            user_id=context.user_id,
+            language=context.language,
+            ip_address=context.ip_address,
+            login_token=context.login_token,
         )
 
 
@@ -153,6 +158,6 @@ class GetUserID(APIKeyBase):
         self.scheme_name = self.__class__.__name__
 
     def __call__(self, request: Request, response: Response):
-        if user_id := request.cookies.get("user_id", request.cookies.get("userId", request.headers.get("userId"))):
+        if user_id := get_auth_context(request).user_id:
             return user_id
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
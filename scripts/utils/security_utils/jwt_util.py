@@ -1,7 +1,15 @@
+import os
+import threading
+import time
+
 import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
 from jwt.exceptions import (
     ExpiredSignatureError,
+    InvalidAlgorithmError,
     InvalidSignatureError,
+    InvalidKeyError,
     MissingRequiredClaimError,
 )
 
@@ -9,51 +17,173 @@ from scripts.config import KeyPath
 from scripts.constants.common_constants import Secrets
 from scripts.errors import AuthenticationError, ErrorMessages
 from scripts.logging import logger
+from scripts.utils.security_utils.token_cache import verified_token_cache
+
+EC_CURVE_ALGORITHMS = {"secp256r1": "ES256", "secp384r1": "ES384", "secp521r1": "ES512"}
+
+
+def key_algorithm(key) -> str:
+    """
+    Returns the JWS algorithm a parsed key signs or verifies with.
+    """
+    if isinstance(key, bytes):
+        return "HS256"
+    if isinstance(key, (rsa.RSAPrivateKey, rsa.RSAPublicKey)):
+        return "RS256"
+    if isinstance(key, (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey)):
+        return "EdDSA"
+    if isinstance(key, (ec.EllipticCurvePrivateKey, ec.EllipticCurvePublicKey)) and key.curve.name in EC_CURVE_ALGORITHMS:
+        return EC_CURVE_ALGORITHMS[key.curve.name]
+    raise InvalidKeyError(f"Unsupported key type {type(key).__name__}")
+
+
+class KeyStore:
+    """
+    Keeps the JWT keys under KeyPath.KEYS_PATH parsed in memory.
+
+    `private`/`public` hold the key pair with kid "default", additional pairs are read
+    from `private.<kid>`/`public.<kid>` and HS256 shared secrets from `secret[.<kid>]`.
+    The algorithm of each kid follows its key type (RSA, Ed25519, EC P-256 or secret).
+    The signing kid comes from an `active_kid` file, else KeyPath.ACTIVE_KID, and only
+    algorithms listed in KeyPath.VERIFY_ALGORITHMS are accepted, so a migration can
+    verify old and new algorithms side by side. The directory is re-checked (inode,
+    mtime, size) at most once per KeyPath.KEY_RELOAD_INTERVAL seconds, so keys can be
+    rotated without a restart.
+    """
+
+    default_kid = "default"
+    active_kid_file = "active_kid"
+
+    def __init__(self, keys_path, reload_interval=5, active_kid=None, verify_algorithms=None):
+        self.keys_path = str(keys_path)
+        self.reload_interval = reload_interval
+        self.configured_kid = active_kid or self.default_kid
+        self.verify_algorithms = set(verify_algorithms or [Secrets.alg])
+        self.private_keys = {}
+        self.public_keys = {}
+        self.algorithms = {}
+        self.active_kid = self.configured_kid
+        self.signing_algorithm = None
+        self._fingerprint = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.reload()
+
+    def _key_files(self):
+        for file_name in sorted(os.listdir(self.keys_path)):
+            prefix, _, kid = file_name.partition(".")
+            if prefix in ("private", "public", "secret") or file_name == self.active_kid_file:
+                yield file_name, prefix, kid or self.default_kid
+
+    def _stat(self):
+        fingerprint = []
+        for file_name, _, _ in self._key_files():
+            stat = os.stat(os.path.join(self.keys_path, file_name))
+            fingerprint.append((file_name, stat.st_ino, stat.st_mtime_ns, stat.st_size))
+        return tuple(fingerprint)
+
+    def reload(self):
+        with self._lock:
+            fingerprint = self._stat()
+            private_keys, public_keys, active_kid = {}, {}, self.configured_kid
+            for file_name, prefix, kid in self._key_files():
+                with open(os.path.join(self.keys_path, file_name), "rb") as f:
+                    data = f.read()
+                if file_name == self.active_kid_file:
+                    active_kid = data.decode().strip() or self.configured_kid
+                elif prefix == "private":
+                    private_keys[kid] = serialization.load_pem_private_key(data, password=None)
+                elif prefix == "public":
+                    public_keys[kid] = serialization.load_pem_public_key(data)
+                else:
+                    private_keys[kid] = public_keys[kid] = data.strip()
+            if active_kid not in private_keys or active_kid not in public_keys:
+                raise InvalidKeyError(f"No key pair found for active kid {active_kid}")
+            if key_algorithm(private_keys[active_kid]) not in self.verify_algorithms:
+                raise InvalidKeyError(f"Active kid {active_kid} signs with an algorithm that is not verified")
+            algorithms = {kid: key_algorithm(key) for kid, key in public_keys.items()}
+            self.private_keys, self.public_keys, self.active_kid = private_keys, public_keys, active_kid
+            self.algorithms = algorithms
+            self.signing_algorithm = key_algorithm(private_keys[active_kid])
+            self._fingerprint = fingerprint
+            self._checked_at = time.monotonic()
+            # claims cached under the previous keys may come from a retired kid or algorithm
+            verified_token_cache.clear()
+            logger.info(f"Loaded JWT keys {algorithms}, signing with {active_kid}")
+
+    def refresh(self):
+        if time.monotonic() - self._checked_at < self.reload_interval:
+            return
+        self._checked_at = time.monotonic()
+        try:
+            if self._stat() != self._fingerprint:
+                self.reload()
+        except Exception as e:
+            # Keep serving the last good keys while a rotation is half written
+            logger.exception(f"Failed to reload JWT keys, keeping previous keys: {str(e)}")
+
+    def signing_key(self):
+        self.refresh()
+        return self.active_kid, self.signing_algorithm, self.private_keys[self.active_kid]
+
+    def verification_key(self, token):
+        self.refresh()
+        header = jwt.get_unverified_header(token)
+        kid = header.get("kid") or self.default_kid
+        if kid not in self.public_keys:
+            raise InvalidSignatureError(f"Unknown key id {kid}")
+        algorithm = self.algorithms[kid]
+        if algorithm not in self.verify_algorithms or header.get("alg") != algorithm:
+            raise InvalidAlgorithmError(f"Algorithm {header.get('alg')} is not accepted for key id {kid}")
+        return algorithm, self.public_keys[kid]
+
+
+key_store = KeyStore(
+    KeyPath.KEYS_PATH,
+    reload_interval=KeyPath.KEY_RELOAD_INTERVAL,
+    active_kid=KeyPath.ACTIVE_KID,
+    verify_algorithms=[name.strip() for name in KeyPath.VERIFY_ALGORITHMS.split(",") if name.strip()],
+)
 
 
 class JWT:
     def __init__(self):
         self.max_login_age = Secrets.LOCK_OUT_TIME_MINS
         self.issuer = Secrets.issuer
-        self.alg = Secrets.alg
-        self.public = KeyPath.PUBLIC
-        self.private = KeyPath.PRIVATE
+        self.keys = key_store
+
+    @property
+    def alg(self):
+        return self.keys.signing_algorithm
 
     def encode(self, payload):
         try:
-            with open(self.private) as f:
-                key = f.read()
-            return jwt.encode(payload, key, algorithm=self.alg)
+            kid, algorithm, key = self.keys.signing_key()
+            return jwt.encode(payload, key, algorithm=algorithm, headers={"kid": kid})
         except Exception as e:
             logger.exception(f"Exception while encoding JWT: {str(e)}")
             raise
-        finally:
-            f.close()
 
     def decode(self, token):
         try:
-            with open(self.public) as f:
-                key = f.read()
-            return jwt.decode(token, key, algorithms=self.alg)
+            algorithm, key = self.keys.verification_key(token)
+            return jwt.decode(token, key, algorithms=[algorithm])
         except Exception as e:
             logger.exception(f"Exception while encoding JWT: {str(e)}")
             raise
-        finally:
-            f.close()
 
     def validate(self, token):
         try:
-            with open(self.public) as f:
-                key = f.read()
+            algorithm, key = self.keys.verification_key(token)
             payload = jwt.decode(
                 token,
                 key,
-                algorithms=self.alg,
+                algorithms=[algorithm],
                 leeway=Secrets.leeway_in_mins,
                 options={"require": ["exp", "iss"]},
             )
             return payload
-        except InvalidSignatureError:
+        except (InvalidSignatureError, InvalidAlgorithmError):
             raise AuthenticationError(ErrorMessages.ERROR003)
         except ExpiredSignatureError:
             raise AuthenticationError(ErrorMessages.ERROR002)
@@ -62,5 +192,3 @@ class JWT:
         except Exception as e:
             logger.exception(f"Exception while validating JWT: {str(e)}")
             raise
-        finally:
-            f.close()
@@ -0,0 +1,121 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+
+from scripts.config import CacheConf, DBConf
+from scripts.db.redis_connection import async_user_permissions_redis
+from scripts.logging import logger
+
+
+class PermissionCache:
+    """
+    Bounded LRU of compiled permission masks ({entity: mask}) per user_id.
+
+    The cache is only consulted while the invalidation listener is subscribed, so a lost
+    Redis connection degrades to direct lookups instead of serving stale grants. The TTL
+    bounds staleness if a writer changes permissions without a keyspace event or publish.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: int = 60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.listening = False
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str):
+        """
+        Returns (hit, masks); a user without permissions is a hit with an empty dict
+        """
+        if not self.listening:
+            self.misses += 1
+            return False, None
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] <= time.monotonic():
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return True, entry[1]
+
+    def put(self, user_id: str, masks: dict, generation: int):
+        """
+        Stores masks read from Redis. `generation` must be read before the Redis lookup,
+        masks fetched while an invalidation arrived are dropped.
+        """
+        with self._lock:
+            if not self.listening or generation != self.generation:
+                return
+            self._entries[user_id] = (time.monotonic() + self.ttl, masks)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: str):
+        with self._lock:
+            self.generation += 1
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses, "listening": self.listening}
+
+
+permission_cache = PermissionCache(maxsize=CacheConf.PERMISSION_CACHE_SIZE, ttl=CacheConf.PERMISSION_CACHE_TTL)
+
+
+async def listen_for_permission_changes(cache: PermissionCache = permission_cache, redis_client=async_user_permissions_redis):
+    """
+    Invalidates cached permissions when a user's hash changes. Listens to keyspace
+    notifications of the permissions db (needs `notify-keyspace-events` with K and h or A)
+    and to CacheConf.PERMISSION_INVALIDATION_CHANNEL, where writers may publish a user id,
+    or "*" to drop everything. Reconnects with backoff and keeps the cache bypassed
+    while disconnected.
+    """
+    keyspace_pattern = f"__keyspace@{DBConf.REDIS_USER_PERMISSION_DB}__:*"
+    keyspace_prefix = keyspace_pattern[:-1]
+    backoff = 1
+    try:
+        notify_config = (await redis_client.config_get("notify-keyspace-events")).get("notify-keyspace-events", "")
+        if "K" not in notify_config or not {"h", "A"} & set(notify_config):
+            logger.warning(
+                "Redis keyspace notifications are disabled, permission cache relies on "
+                f"{CacheConf.PERMISSION_INVALIDATION_CHANNEL} publishes and its TTL"
+            )
+    except Exception as e:
+        logger.warning(f"Unable to read notify-keyspace-events: {str(e)}")
+    while True:
+        pubsub = redis_client.pubsub()
+        try:
+            await pubsub.psubscribe(keyspace_pattern)
+            await pubsub.subscribe(CacheConf.PERMISSION_INVALIDATION_CHANNEL)
+            cache.clear()
+            cache.listening = True
+            backoff = 1
+            async for message in pubsub.listen():
+                if message["type"] == "pmessage":
+                    cache.invalidate_user(message["channel"][len(keyspace_prefix):])
+                elif message["type"] == "message":
+                    if message["data"] == "*":
+                        cache.clear()
+                    else:
+                        cache.invalidate_user(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception(f"Permission invalidation listener disconnected: {str(e)}")
+        finally:
+            cache.listening = False
+            cache.clear()
+            await pubsub.reset()
+        await asyncio.sleep(backoff)
+        backoff = min(backoff * 2, 30)
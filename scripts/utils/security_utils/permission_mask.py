@@ -0,0 +1,54 @@
+from typing import Iterable, List, Optional
+
+import orjson as json
+
+from scripts.constants.common_constants import PermissionOperations
+from scripts.logging import logger
+
+
+def compile_operations(operations: Iterable[str]) -> int:
+    """
+    Returns the mask with the bit of every given operation set
+    """
+    mask = 0
+    for operation in operations:
+        mask |= 1 << PermissionOperations.BITS[operation]
+    return mask
+
+
+def unknown_operations(record: dict) -> List[str]:
+    """
+    Operations of a legacy JSON permission record that have no bit position
+    """
+    return [operation for operation in record if operation not in PermissionOperations.BITS]
+
+
+def compile_permission_record(record: dict, user_id: Optional[str] = None) -> int:
+    """
+    Converts a legacy JSON permission record ({"view": true, ...}) to a mask.
+    Operations without a bit position are dropped with a warning, callers persisting
+    the mask should check unknown_operations first.
+    """
+    mask = 0
+    for operation, allowed in record.items():
+        if operation not in PermissionOperations.BITS:
+            logger.warning(f"Ignoring unknown permission {operation} of user {user_id}")
+            continue
+        if allowed:
+            mask |= 1 << PermissionOperations.BITS[operation]
+    return mask
+
+
+def parse_permission_value(value: str, user_id: Optional[str] = None) -> int:
+    """
+    Reads a permission hash value, accepting both compiled masks and legacy JSON records
+    so that RBAC keeps working while the migration runs. A value that is neither grants
+    nothing, so the entity is denied rather than treated like a missing record.
+    """
+    try:
+        if value.startswith("{"):
+            return compile_permission_record(json.loads(value), user_id=user_id)
+        return int(value)
+    except ValueError:
+        logger.warning(f"Denying malformed permission value {value!r} of user {user_id}")
+        return 0
@@ -5,6 +5,8 @@ from fastapi.openapi.models import APIKey, APIKeyIn
 from fastapi.security.api_key import APIKeyBase, APIKeyCookie
 from pydantic import BaseModel
 
+from scripts.utils.security_utils.auth_context import get_auth_context
+
 
 class MetaInfoSchema(BaseModel):
     user_id: Optional[str] = ""
@@ -27,14 +29,10 @@ class MetaInfoCookie(APIKeyBase):
         self.scheme = APIKeyCookie(name=self.cookie_name, auto_error=False)
 
     async def __call__(self, request: Request, response: Response):
-        cookies = request.cookies
-        cookie_json = {
-            "userId": cookies.get("user_id", cookies.get("userId", request.headers.get("userId"))),
-            "language": cookies.get("language", request.headers.get("language")),
-        }
-        return MetaInfoSchema(
-            user_id=cookie_json["userId"], language=cookie_json["language"]
-        )
+        context = get_auth_context(request)
+        if context.meta is None:
+            context.meta = MetaInfoSchema.model_construct(user_id=context.user_id, language=context.language)
+        return context.meta
 
     @staticmethod
     def set_response_info(cookie_name, cookie_value, response: Response):
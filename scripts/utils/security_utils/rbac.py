@@ -1,26 +1,58 @@
-import logging
-
-import orjson as json
 from fastapi import HTTPException, Request, status
 
-from scripts.db.redis_connection import user_permissions_redis
+from scripts.constants.common_constants import PermissionOperations
+from scripts.db.redis_connection import async_user_permissions_redis
+from scripts.utils.metrics import redis_command_duration
+from scripts.utils.security_utils.auth_context import get_auth_context
+from scripts.utils.security_utils.permission_cache import permission_cache
+from scripts.utils.security_utils.permission_mask import compile_operations, parse_permission_value
 
 
 class RBAC:
-    def __init__(self, entity_name: str, operation: list[str]):
+    """
+    Checks the operations of a user on an entity. Users without any record for the entity
+    are let through unless `require_grant` is set, which routes exposing internals use.
+    """
+
+    def __init__(self, entity_name: str, operation: list[str], require_grant: bool = False):
         self.entity_name = entity_name
         self.operation = operation
+        self.require_grant = require_grant
+        self.required_mask = compile_operations(operation)
+        self.operation_bits = [(i, 1 << PermissionOperations.BITS[i]) for i in operation]
 
-    def check_permissions(self, user_id: str) -> dict[str, bool]:
-        user_permission_rec = user_permissions_redis.hget(user_id, self.entity_name)
-        if not user_permission_rec:
+    @staticmethod
+    async def fetch_user_permissions(user_id: str) -> dict[str, int]:
+        """
+        Returns the compiled permission mask of every entity of the user, read with one HGETALL
+        """
+        hit, masks = permission_cache.get(user_id)
+        if hit:
+            return masks
+        generation = permission_cache.generation
+        with redis_command_duration.time("user_permissions", "HGETALL"):
+            user_permission_rec = await async_user_permissions_redis.hgetall(user_id)
+        masks = {
+            entity: parse_permission_value(value, user_id=user_id) for entity, value in user_permission_rec.items()
+        }
+        permission_cache.put(user_id, masks, generation)
+        return masks
+
+    def evaluate(self, masks: dict[str, int]) -> dict[str, bool]:
+        if self.entity_name not in masks:
+            if self.require_grant:
+                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient Permission!")
             return {}  # TODO: raise exception here
-        user_permission_rec = json.loads(user_permission_rec)
-        if permission_dict := {i: True for i in self.operation if user_permission_rec.get(i)}:
-            return permission_dict
+        if granted := masks[self.entity_name] & self.required_mask:
+            return {i: True for i, bit in self.operation_bits if granted & bit}
         else:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient Permission!")
 
-    def __call__(self, request: Request) -> dict[str, bool]:
-        user_id = request.cookies.get("userId", request.headers.get("userId"))
-        return self.check_permissions(user_id=user_id)
+    async def check_permissions(self, user_id: str) -> dict[str, bool]:
+        return self.evaluate(await self.fetch_user_permissions(user_id))
+
+    async def __call__(self, request: Request) -> dict[str, bool]:
+        context = get_auth_context(request)
+        if context.permissions is None:
+            context.permissions = await self.fetch_user_permissions(context.user_id)
+        return self.evaluate(context.permissions)
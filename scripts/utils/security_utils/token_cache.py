@@ -0,0 +1,70 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from scripts.config import CacheConf
+
+
+class VerifiedTokenCache:
+    """
+    LRU cache of JWT claims that already passed signature verification.
+
+    Entries are keyed by a SHA-256 digest of the token, so raw session tokens are never
+    kept as dictionary keys, and expire `expiry_margin` seconds before the token's `exp`.
+    The returned claims are shared between requests and must be treated as read-only.
+    """
+
+    def __init__(self, maxsize: int = 10000, expiry_margin: int = 5):
+        self.maxsize = maxsize
+        self.expiry_margin = expiry_margin
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        key = self._digest(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, claims = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return claims
+
+    def put(self, token: str, claims: dict):
+        if not isinstance(claims.get("exp"), (int, float)):
+            return
+        expires_at = claims["exp"] - self.expiry_margin
+        if expires_at <= time.time():
+            return
+        key = self._digest(token)
+        with self._lock:
+            self._entries[key] = (expires_at, claims)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+verified_token_cache = VerifiedTokenCache(
+    maxsize=CacheConf.TOKEN_CACHE_SIZE, expiry_margin=CacheConf.TOKEN_CACHE_EXPIRY_MARGIN
+)
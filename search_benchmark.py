@@ -0,0 +1,76 @@
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from scripts.db.mongo import async_mongo_client
+from scripts.db.mongo.blog_posts.collections.blog_posts import BlogPostCollection
+
+WORDS = [
+    "async", "cache", "cluster", "compile", "database", "deploy", "docker", "index", "kernel", "latency",
+    "memory", "network", "python", "query", "queue", "redis", "replica", "schema", "search", "shard",
+    "socket", "stream", "thread", "token", "vector", "worker", "mongo", "fastapi", "profile", "benchmark",
+]
+
+
+def synthetic_posts(count, seed, start=0):
+    """
+    Yields posts with a Zipf-like word distribution, so some search terms are common and some rare
+    """
+    rng = random.Random(seed + start)
+    weights = [1 / (rank + 1) for rank in range(len(WORDS))]
+    for number in range(start, start + count):
+        yield {
+            "post_id": f"post_{number}",
+            "title": " ".join(rng.choices(WORDS, weights, k=6)),
+            "content": " ".join(rng.choices(WORDS, weights, k=120)),
+            "is_delete": False,
+            "meta": {},
+        }
+
+
+async def seed(collection, total, batch_size, seed_value):
+    existing = await collection.count_documents({}, limit=None)
+    for start in range(existing, total, batch_size):
+        await collection.insert_many(list(synthetic_posts(min(batch_size, total - start), seed_value, start)))
+        print(f"\rseeded {min(start + batch_size, total):,}/{total:,}", end="", flush=True)
+    print()
+
+
+async def run(arguments):
+    collection = BlogPostCollection(async_mongo_client)
+    collection.database = arguments.database
+    await collection.create_indexes()
+    await seed(collection, arguments.posts, arguments.batch_size, arguments.seed)
+    rng = random.Random(arguments.seed)
+    queries = [" ".join(rng.sample(WORDS, rng.randint(1, 3))) for _ in range(arguments.queries)]
+    timings = []
+    for text in queries:
+        start = time.perf_counter()
+        await collection.search_posts(text, limit=arguments.page_size)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    print(f"{len(queries)} searches over {arguments.posts:,} posts, page size {arguments.page_size}")
+    for label, value in (
+        ("p50", statistics.median(timings)),
+        ("p95", timings[int(len(timings) * 0.95) - 1]),
+        ("p99", timings[int(len(timings) * 0.99) - 1]),
+        ("max", timings[-1]),
+    ):
+        print(f"{label:<5}{value:>10.1f} ms")
+    if arguments.drop:
+        await async_mongo_client.drop_database(arguments.database)
+
+
+# search latency benchmark against a synthetic corpus, run against a scratch database
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--database", default="blog_posts_search_benchmark", help="Scratch database to seed and query.")
+    ap.add_argument("--posts", type=int, default=1_000_000, help="Corpus size, existing posts are reused.")
+    ap.add_argument("--batch-size", type=int, default=10_000, help="Posts per insert_many while seeding.")
+    ap.add_argument("--queries", type=int, default=500, help="Number of searches to time.")
+    ap.add_argument("--page-size", type=int, default=20, help="Results fetched per search.")
+    ap.add_argument("--seed", type=int, default=7, help="Random seed for the corpus and queries.")
+    ap.add_argument("--drop", action="store_true", help="Drop the scratch database afterwards.")
+    asyncio.run(run(ap.parse_args()))
@@ -0,0 +1,9 @@
+import os
+import tempfile
+
+# scripts.config exits without these, the tests never reach mongod or redis
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017")
+os.environ.setdefault("REDIS_URI", "redis://localhost:6379")
+os.environ.setdefault("BASE_PATH", tempfile.mkdtemp(prefix="blog_tests_"))
+os.environ.setdefault("MOUNT_DIR", "tests")
+os.environ.setdefault("KEYS_PATH", os.path.join(os.environ["BASE_PATH"], "keys"))
@@ -0,0 +1,96 @@
+import asyncio
+import random
+from collections import Counter
+
+import pytest
+
+from scripts.utils.id_allocator import IdBlockAllocator
+
+
+class StubUniqueId:
+    """
+    In-memory stand-in for UniqueId.reserve_block. Yields to the loop before and after the
+    increment, like a Mongo round trip, so concurrent callers interleave. Records every
+    block it hands out.
+    """
+
+    def __init__(self, seed=7):
+        self.counters = {}
+        self.reserved = []
+        self.rng = random.Random(seed)
+
+    async def reserve_block(self, key, size=1):
+        await asyncio.sleep(self.rng.random() / 1000)
+        high = self.counters.get(key, 99) + size
+        self.counters[key] = high
+        self.reserved.append(range(high - size + 1, high + 1))
+        await asyncio.sleep(0)
+        return high
+
+
+async def draw(allocator, requests, seed):
+    rng = random.Random(seed)
+    ids = []
+    for _ in range(requests):
+        ids.extend(await allocator.next_ids(rng.choice((1, 1, 1, 3, 25))))
+        await asyncio.sleep(0)
+    return ids
+
+
+def held(allocator):
+    return [each for block in allocator._blocks for each in block]
+
+
+@pytest.mark.parametrize("block_size", [1, 4, 20])
+def test_concurrent_next_ids_are_unique_and_gapless(block_size):
+    async def scenario():
+        unique_con = StubUniqueId()
+        allocator = IdBlockAllocator(unique_con, key="post_id", block_size=block_size)
+        per_task = await asyncio.gather(*(draw(allocator, 50, seed) for seed in range(20)))
+        if allocator._refill_task is not None:
+            await allocator._refill_task
+        return unique_con, allocator, [int(each) for ids in per_task for each in ids]
+
+    unique_con, allocator, ids = asyncio.run(scenario())
+    duplicates = [each for each, seen in Counter(ids).items() if seen > 1]
+    assert not duplicates
+    # every reserved id was either handed out or is still held, nothing inside a block is skipped
+    reserved = sorted(each for block in unique_con.reserved for each in block)
+    assert sorted(ids + held(allocator)) == reserved
+    assert reserved == list(range(100, 100 + len(reserved)))
+
+
+def test_allocators_sharing_a_counter_never_collide():
+    """
+    One allocator per simulated worker process, all reserving from the same counter
+    """
+
+    async def scenario():
+        unique_con = StubUniqueId()
+        allocators = [IdBlockAllocator(unique_con, key="post_id", block_size=20) for _ in range(8)]
+        per_task = await asyncio.gather(
+            *(draw(allocators[seed % len(allocators)], 30, seed) for seed in range(32))
+        )
+        return [each for ids in per_task for each in ids]
+
+    ids = asyncio.run(scenario())
+    assert len(ids) == len(set(ids))
+
+
+def test_failed_reservation_is_raised_and_retried():
+    class FlakyUniqueId(StubUniqueId):
+        failures = 1
+
+        async def reserve_block(self, key, size=1):
+            if self.failures:
+                self.failures -= 1
+                raise ConnectionError("mongod unavailable")
+            return await super().reserve_block(key, size)
+
+    async def scenario():
+        allocator = IdBlockAllocator(FlakyUniqueId(), key="post_id", block_size=5)
+        with pytest.raises(ConnectionError):
+            await allocator.next_ids(1)
+        return await allocator.next_ids(3)
+
+    assert asyncio.run(scenario()) == ["100", "101", "102"]
@@ -0,0 +1,67 @@
+import argparse
+import logging
+import time
+
+from scripts.logging import TraceSummary, logger
+
+
+def sample_update():
+    """
+    An update as save_blog_post_details sends it, with a ~11 KB post body
+    """
+    return {
+        "$set": {
+            "title": "Post title",
+            "content": "lorem ipsum dolor sit amet " * 400,
+            "is_delete": False,
+            "meta.updated_by": "user_099",
+            "meta.updated_at": 1700000000000,
+        },
+        "$setOnInsert": {"meta.created_by": "user_099", "meta.created_at": 1700000000000},
+    }
+
+
+class FormatOnlyHandler(logging.Handler):
+    """
+    Formats every record like a real handler would, without writing it anywhere
+    """
+
+    def emit(self, record):
+        self.format(record)
+
+
+def eager(collection, query, update):
+    logger.qtrace(f"{collection}, {query}, {update}")
+
+
+def lazy(collection, query, update):
+    logger.qtrace("%s, %s, %s", collection, TraceSummary(query), TraceSummary(update))
+
+
+def microseconds_per_call(func, calls, *args):
+    start = time.perf_counter()
+    for _ in range(calls):
+        func(*args)
+    return (time.perf_counter() - start) * 1_000_000 / calls
+
+
+def run(calls, traces_per_request):
+    args = ("blog_posts", {"post_id": "post_100"}, sample_update())
+    # measure message construction and formatting, not console/file output
+    logger.handlers, handlers = [FormatOnlyHandler()], logger.handlers
+    print(f"{'logger level':<14}{'eager us':>10}{'lazy us':>10}{'saved us/request':>18}")
+    for level in ("INFO", "QTRACE"):
+        logger.setLevel(level)
+        eager_cost = microseconds_per_call(eager, calls, *args)
+        lazy_cost = microseconds_per_call(lazy, calls, *args)
+        print(f"{level:<14}{eager_cost:>10.2f}{lazy_cost:>10.2f}{(eager_cost - lazy_cost) * traces_per_request:>18.2f}")
+    logger.handlers = handlers
+
+
+# CPU cost of Mongo query tracing, f-string messages vs deferred TraceSummary arguments
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--calls", "-n", type=int, default=100_000, help="Trace calls per measurement.")
+    ap.add_argument("--traces-per-request", type=int, default=3, help="Mongo calls traced by one API request.")
+    arguments = ap.parse_args()
+    run(arguments.calls, arguments.traces_per_request)